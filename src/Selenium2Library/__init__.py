@@ -137,6 +137,15 @@ class Selenium2Library(
     or in Robot Framework's time syntax (e.g. '1.5 seconds' or '1 min 30 s').
     For more information about the time syntax see the
     [http://robotframework.org/robotframework/latest/RobotFrameworkUserGuide.html#time-format|Robot Framework User Guide].
+
+    = Output files =
+
+    Keywords that write files, such as `Export Table To Csv`, `Set
+    Locator Statistics Report` and `Set Wait Statistics Report`, consider a
+    relative `path` relative to the directory where the Robot Framework log
+    file is written. Missing directories are created. Reports are written
+    when the suite in which they were requested ends, so requesting them in
+    the top level suite setup produces a report of the whole run.
     """
 
     ROBOT_LIBRARY_SCOPE = 'GLOBAL'
@@ -146,7 +155,9 @@ class Selenium2Library(
                  timeout=5.0,
                  implicit_wait=0.0,
                  run_on_failure='Capture Page Screenshot',
-                 screenshot_root_directory=None
+                 screenshot_root_directory=None,
+                 poll_strategy='fixed',
+                 wait_engine='python'
     ):
 
         """Selenium2Library can be imported with optional arguments.
@@ -172,6 +183,14 @@ class Selenium2Library(
         `screenshot_root_directory` specifies the default root directory that screenshots should be
         stored in. If not provided the default directory will be where robotframework places its logfile.
 
+        `poll_strategy` specifies how often `Wait ...` keywords check their
+        condition. It can be `fixed`, `exponential` or `jitter`, and it can be
+        later set with `Set Wait Poll Strategy`.
+
+        `wait_engine` specifies whether `Wait ...` keywords check their
+        condition with WebDriver (`python`) or inside the browser (`browser`).
+        It can be later set with `Set Wait Engine`.
+
         Examples:
         | Library `|` Selenium2Library `|` 15                                            | # Sets default timeout to 15 seconds                                       |
         | Library `|` Selenium2Library `|` 0 `|` 5                                       | # Sets default timeout to 0 seconds and default implicit_wait to 5 seconds |
@@ -185,4 +204,6 @@ class Selenium2Library(
         self.set_selenium_timeout(timeout)
         self.set_selenium_implicit_wait(implicit_wait)
         self.register_keyword_to_run_on_failure(run_on_failure)
+        self.set_wait_poll_strategy(poll_strategy)
+        self.set_wait_engine(wait_engine)
         self.ROBOT_LIBRARY_LISTENER = LibraryListener()
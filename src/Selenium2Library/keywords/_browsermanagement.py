@@ -234,7 +234,13 @@ class _BrowserManagementKeywords(KeywordGroup):
         return self._log_list(values)
 
     def get_window_titles(self):
-        """Returns and logs titles of all windows known to the browser."""
+        """Returns and logs titles of all windows known to the browser.
+
+        Windows are only switched to when they are new or have navigated
+        since they were last read. A title that a script in another window
+        changed may thus be returned outdated. `Select Window` checks the
+        window it selects and is not affected.
+        """
         return self._log_list(self._window_manager.get_window_titles(self._current_browser()))
 
     def maximize_browser_window(self):
@@ -332,6 +338,31 @@ class _BrowserManagementKeywords(KeywordGroup):
         finally:
             self._window_manager.select(self._current_browser(), locator)
 
+    def wait_for_new_window(self, timeout=None):
+        """Waits until a new window opens, selects it and returns its handle.
+
+        A window is new if its handle has not been seen by the library
+        before, for example with `List Windows`, `Select Window` or `Get
+        Window Titles`, and it is not the current window. Only the list of
+        window handles is polled while waiting, with increasing intervals,
+        so no other window is switched to before the new one appears.
+
+        Fails if no new window opens before `timeout` expires. See
+        `introduction` for more information about `timeout` and its default
+        value.
+
+        Example:
+        | Click Link | popup_link | # opens new window |
+        | ${handle} = | Wait For New Window | 10 s |
+        | Title Should Be | Popup Title |
+        """
+        timeout_in_secs = robot.utils.timestr_to_secs(timeout) if timeout is not None else self._timeout_in_secs
+        handle = self._window_manager.wait_for_new_window(self._current_browser(), timeout_in_secs)
+        if handle is None:
+            raise AssertionError("No new window opened in %s."
+                                 % robot.utils.secs_to_timestr(timeout_in_secs))
+        return handle
+
     def list_windows(self):
         """Return all current window handles as a list"""
         return self._current_browser().get_window_handles()
@@ -482,6 +513,11 @@ class _BrowserManagementKeywords(KeywordGroup):
             wait for an element to be found, or a command to complete.
             This method only needs to be called one time per session.'
 
+        Keywords verifying that an element or text is not on the page, such
+        as `Page Should Not Contain Element` and `Wait Until Page Does Not
+        Contain`, temporarily set the implicit wait to zero so that they do
+        not wait for elements that are not expected to appear.
+
         Example:
         | ${orig wait} = | Set Selenium Implicit Wait | 10 seconds |
         | Perform AJAX call that is slow |
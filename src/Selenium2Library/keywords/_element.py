@@ -1,3 +1,6 @@
+import codecs
+import importlib
+from contextlib import contextmanager
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.remote.webelement import WebElement
@@ -35,6 +38,24 @@ class _ElementKeywords(KeywordGroup):
         """
         return self._element_find(locator, False, True)
 
+    def get_webelements_batch(self, locators):
+        """Returns a dictionary mapping each of the given `locators` to a list of matching WebElements.
+
+        `locators` is a list of locators. All locators using the `id`,
+        `name`, `identifier`, `xpath`, `css`, `class` or `tag` strategy or
+        the default strategy are resolved with a single JavaScript call,
+        other locators are resolved one by one. Locators not matching any
+        element are mapped to an empty list.
+
+        Example:
+        | @{locators} = | Create List | id=username | css=#password | xpath=//button |
+        | ${elements} = | Get WebElements Batch | ${locators} |
+        | Click Element | ${elements['xpath=//button'][0]} |
+
+        See `introduction` for details about locating elements.
+        """
+        return self._element_find_many(locators)
+
     # Public, element lookups
 
     def current_frame_contains(self, text, loglevel='INFO'):
@@ -54,7 +75,7 @@ class _ElementKeywords(KeywordGroup):
 
         See `Page Should Contain ` for explanation about `loglevel` argument.
         """
-        if self._is_text_present(text):
+        if self._is_text_present_now(text):
             self.log_source(loglevel)
             raise AssertionError("Page should not have contained text '%s' "
                                  "but it did" % text)
@@ -138,6 +159,32 @@ class _ElementKeywords(KeywordGroup):
         """
         self._page_should_contain_element(locator, None, message, loglevel)
 
+    def page_should_contain_elements(self, locators, message='', loglevel='INFO'):
+        """Verifies elements identified by all `locators` are found on the current page.
+
+        `locators` is a list of locators which are resolved in one go as
+        explained in `Get WebElements Batch`. All locators not matching any
+        element are reported in the error message.
+
+        `message` can be used to override the default error message.
+
+        See `Page Should Contain` for explanation about `loglevel` argument.
+
+        Example:
+        | @{locators} = | Create List | id=username | id=password | css=button.login |
+        | Page Should Contain Elements | ${locators} |
+        """
+        elements = self._element_find_many(locators)
+        missing = [locator for locator in self._as_locator_list(locators)
+                   if len(elements[locator]) == 0]
+        if missing:
+            if not message:
+                message = "Page should have contained elements %s but did not"\
+                           % ', '.join("'%s'" % locator for locator in missing)
+            self.log_source(loglevel)
+            raise AssertionError(message)
+        self._info("Current page contains all %d elements." % len(elements))
+
     def locator_should_match_x_times(self, locator, expected_locator_count, message='', loglevel='INFO'):
         """Verifies that the page contains the given number of elements located by the given `locator`.
 
@@ -161,7 +208,7 @@ class _ElementKeywords(KeywordGroup):
 
         See `Page Should Contain ` for explanation about `loglevel` argument.
         """
-        if self._page_contains(text):
+        if self._page_contains_now(text):
             self.log_source(loglevel)
             raise AssertionError("Page should not have contained text '%s'" % text)
         self._info("Current page does not contain text '%s'." % text)
@@ -326,6 +373,7 @@ class _ElementKeywords(KeywordGroup):
 
         See `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         element = self._element_find(locator, True, True)
         element.clear()
 
@@ -350,6 +398,7 @@ class _ElementKeywords(KeywordGroup):
         Key attributes for arbitrary elements are `id` and `name`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Clicking element '%s'." % locator)
         self._element_find(locator, True, True).click()
 
@@ -361,6 +410,7 @@ class _ElementKeywords(KeywordGroup):
         Key attributes for arbitrary elements are `id` and `name`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Click clicking element '%s' in coordinates '%s', '%s'." % (locator, xoffset, yoffset))
         element = self._element_find(locator, True, True)
         #self._element_find(locator, True, True).click()
@@ -373,12 +423,14 @@ class _ElementKeywords(KeywordGroup):
         Key attributes for arbitrary elements are `id` and `name`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Double clicking element '%s'." % locator)
         element = self._element_find(locator, True, True)
         ActionChains(self._current_browser()).double_click(element).perform()
 
     def focus(self, locator):
         """Sets focus to element identified by `locator`."""
+        self._wait_for_page_idle_before_action()
         element = self._element_find(locator, True, True)
         self._current_browser().execute_script("arguments[0].focus();", element)
 
@@ -394,6 +446,7 @@ class _ElementKeywords(KeywordGroup):
         Examples:
         | Drag And Drop | elem1 | elem2 | # Move elem1 over elem2. |
         """
+        self._wait_for_page_idle_before_action()
         src_elem = self._element_find(source,True,True)
         trg_elem =  self._element_find(target,True,True)
         ActionChains(self._current_browser()).drag_and_drop(src_elem, trg_elem).perform()
@@ -408,6 +461,7 @@ class _ElementKeywords(KeywordGroup):
         Examples:
         | Drag And Drop By Offset | myElem | 50 | -35 | # Move myElem 50px right and 35px down. |
         """
+        self._wait_for_page_idle_before_action()
         src_elem = self._element_find(source, True, True)
         ActionChains(self._current_browser()).drag_and_drop_by_offset(src_elem, xoffset, yoffset).perform()
 
@@ -422,6 +476,7 @@ class _ElementKeywords(KeywordGroup):
         See also the more specific keywords `Mouse Down On Image` and
         `Mouse Down On Link`.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Simulating Mouse Down on element '%s'" % locator)
         element = self._element_find(locator, True, False)
         if element is None:
@@ -434,6 +489,7 @@ class _ElementKeywords(KeywordGroup):
         Key attributes for arbitrary elements are `id` and `name`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Simulating Mouse Out on element '%s'" % locator)
         element = self._element_find(locator, True, False)
         if element is None:
@@ -449,6 +505,7 @@ class _ElementKeywords(KeywordGroup):
         Key attributes for arbitrary elements are `id` and `name`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Simulating Mouse Over on element '%s'" % locator)
         element = self._element_find(locator, True, False)
         if element is None:
@@ -461,6 +518,7 @@ class _ElementKeywords(KeywordGroup):
         Key attributes for arbitrary elements are `id` and `name`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Simulating Mouse Up on element '%s'" % locator)
         element = self._element_find(locator, True, False)
         if element is None:
@@ -469,6 +527,7 @@ class _ElementKeywords(KeywordGroup):
 
     def open_context_menu(self, locator):
         """Opens context menu on element identified by `locator`."""
+        self._wait_for_page_idle_before_action()
         element = self._element_find(locator, True, True)
         ActionChains(self._current_browser()).context_click(element).perform()
 
@@ -480,6 +539,7 @@ class _ElementKeywords(KeywordGroup):
 
         See `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         element = self._element_find(locator, True, True)
         script = """
 element = arguments[0];
@@ -502,6 +562,7 @@ return !element.dispatchEvent(evt);
         | Press Key | text_field   | abcde |
         | Press Key | login_button | \\\\13 | # ASCII code for enter key |
         """
+        self._wait_for_page_idle_before_action()
         if key.startswith('\\') and len(key) > 1:
             key = self._map_ascii_key_code_to_key(int(key[1:]))
         element = self._element_find(locator, True, True)
@@ -516,6 +577,7 @@ return !element.dispatchEvent(evt);
         Key attributes for links are `id`, `name`, `href` and link text. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Clicking link '%s'." % locator)
         link = self._element_find(locator, True, True, tag='a')
         link.click()
@@ -536,6 +598,7 @@ return !element.dispatchEvent(evt);
         Key attributes for links are `id`, `name`, `href` and link text. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         element = self._element_find(locator, True, True, 'link')
         ActionChains(self._current_browser()).click_and_hold(element).perform()
 
@@ -569,6 +632,7 @@ return !element.dispatchEvent(evt);
         Key attributes for images are `id`, `src` and `alt`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Clicking image '%s'." % locator)
         element = self._element_find(locator, True, False, 'image')
         if element is None:
@@ -582,6 +646,7 @@ return !element.dispatchEvent(evt);
         Key attributes for images are `id`, `src` and `alt`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         element = self._element_find(locator, True, True, 'image')
         ActionChains(self._current_browser()).click_and_hold(element).perform()
 
@@ -649,12 +714,18 @@ return !element.dispatchEvent(evt);
                    % (actual_xpath_count, xpath))
 
     # Public, custom
-    def add_location_strategy(self, strategy_name, strategy_keyword, persist=False):
+    def add_location_strategy(self, strategy_name, strategy_keyword, persist=False, memoize=False):
         """Adds a custom location strategy based on a user keyword. Location strategies are
         automatically removed after leaving the current scope by default. Setting `persist`
         to any non-empty string will cause the location strategy to stay registered throughout
         the life of the test.
 
+        Setting `memoize` to a true value makes the elements found with the
+        strategy to be remembered until the page changes, so the same locator
+        does not run the keyword again. `memoize` is considered false if it is
+        an empty string or one of `False`, `No`, `Off`, `0` or `None`
+        (case-insensitive). See `Clear Custom Locator Cache` for details.
+
         Trying to add a custom location strategy with the same name as one that already exists will
         cause the keyword to fail.
 
@@ -667,11 +738,54 @@ return !element.dispatchEvent(evt);
         | Add Location Strategy | custom | Custom Locator Strategy |
         | Page Should Contain Element | custom=my_id |
 
-        See `Remove Location Strategy` for details about removing a custom location strategy.
+        See `Remove Location Strategy` for details about removing a custom location strategy
+        and `Add Python Location Strategy` for a faster alternative to keywords.
+        """
+        strategy = CustomLocator(strategy_name, strategy_keyword, utils.is_truthy(memoize))
+        self._element_finder.register(strategy, persist)
+
+    def add_python_location_strategy(self, strategy_name, function, persist=False, memoize=False):
+        """Adds a custom location strategy implemented as a Python function.
+
+        `function` is either a callable or the name of an importable function
+        in format `module.function`. The function is called directly with
+        arguments `browser`, `criteria`, `tag` and `constraints`, and it must
+        return a WebElement or a list of WebElements. Unlike with
+        `Add Location Strategy`, no keyword is run, so the strategy avoids the
+        overhead of keyword execution and logging on every lookup.
+
+        `persist` and `memoize` work the same way as with `Add Location Strategy`.
+
+        Custom locator function example:
+        | def find_by_data_test(browser, criteria, tag, constraints):
+        |     return browser.find_elements_by_css_selector('[data-test="%s"]' % criteria)
+
+        Usage example:
+        | Add Python Location Strategy | test | mylocators.find_by_data_test | memoize=True |
+        | Page Should Contain Element | test=submit |
         """
-        strategy = CustomLocator(strategy_name, strategy_keyword)
+        if isstr(function):
+            function = self._import_location_strategy(function)
+        strategy = CustomLocator(strategy_name, function, utils.is_truthy(memoize))
         self._element_finder.register(strategy, persist)
 
+    def clear_custom_locator_cache(self, strategy_name=None):
+        """Forgets elements remembered by custom location strategies on the current page.
+
+        Custom location strategies added with `memoize` remember the elements
+        they find until the page changes, for example after navigation,
+        clicking or typing. Lookups that find nothing are not remembered, and
+        a remembered element that is no longer attached to the page is found
+        again. If the page changes by itself so that a locator would match
+        other elements that are still attached, this keyword can be used to
+        find elements again.
+        By default results of all strategies are forgotten. `strategy_name` can
+        be used to forget only the results of a certain strategy.
+
+        See `Add Location Strategy` and `Add Python Location Strategy`.
+        """
+        self._element_finder.clear_custom_locator_cache(self._current_browser(), strategy_name)
+
     def remove_location_strategy(self, strategy_name):
         """Removes a previously added custom location strategy.
         Will fail if a default strategy is specified.
@@ -680,12 +794,217 @@ return !element.dispatchEvent(evt);
         """
         self._element_finder.unregister(strategy_name)
 
+    def set_sizzle_engine_source(self, path=None):
+        """Sets a JavaScript file that is injected to pages lacking jQuery for `jquery` and `sizzle` locators.
+
+        Locators with the `jquery` or `sizzle` prefix are evaluated with
+        jQuery or Sizzle available on the page. Which one is available is
+        detected once per page, and pages without either fall back to the
+        browser's own `querySelectorAll`, which supports standard CSS
+        selectors but not jQuery extensions such as `:contains`.
+
+        If `path` points to a file containing Sizzle or jQuery, its content
+        is injected once to every page that has neither of them, so that
+        jQuery selector extensions work everywhere. Calling this keyword
+        without a `path` stops injecting.
+
+        Example:
+        | Set Sizzle Engine Source | ${CURDIR}/sizzle.min.js |
+        | Click Element | sizzle=li:contains('Logout') |
+        """
+        if path:
+            with codecs.open(path, encoding='UTF-8') as engine_file:
+                self._element_finder.selector_engine_source = engine_file.read()
+        else:
+            self._element_finder.selector_engine_source = None
+
+    def set_browser_side_element_filtering(self, enabled):
+        """Sets whether tag and attribute filtering of found elements is done in the browser.
+
+        Keywords that expect a certain kind of element, such as `Click Link`,
+        `Select Checkbox` or `Input Text`, filter the elements matching the
+        locator by their tag name and, for example, by their `type`
+        attribute. By default this is done one element at a time, which
+        costs one or more WebDriver calls per matching element. When enabled,
+        all candidates are filtered with a single JavaScript call instead.
+
+        `enabled` is considered false if it is an empty string or one of
+        `False`, `No`, `Off`, `0` or `None` (case-insensitive). Returns the
+        previous value.
+
+        Example:
+        | Set Browser Side Element Filtering | True |
+        | Select Checkbox | agree | # candidates are filtered in one call |
+        """
+        old_value = self._element_finder.filter_in_browser
+        self._element_finder.filter_in_browser = utils.is_truthy(enabled)
+        return old_value
+
+    def set_locator_optimization(self, enabled):
+        """Sets whether simple XPath locators are rewritten to faster lookups.
+
+        When enabled, XPath locators that only select elements by their tag
+        name and attribute values, such as `//*[@id='foo']`,
+        `//input[@name='q']` or `//div[contains(@class,'x')]`, are executed
+        as id, name, tag or CSS selector lookups, which browsers resolve
+        considerably faster. Default locators without a strategy prefix are
+        then also searched with a CSS selector whenever the searched
+        attributes allow it. Rewrites are logged on DEBUG level.
+
+        Note that browsers match some HTML attribute values, for example
+        `type`, case-insensitively in CSS selectors.
+
+        `enabled` is considered false if it is an empty string or one of
+        `False`, `No`, `Off`, `0` or `None` (case-insensitive). Returns the
+        previous value.
+
+        Example:
+        | Set Locator Optimization | True |
+        | Click Element | //button[@id='submit'] | # executed as `id=submit` |
+        """
+        old_value = self._element_finder.optimize_locators
+        self._element_finder.optimize_locators = utils.is_truthy(enabled)
+        return old_value
+
+    def get_locator_cache_statistics(self):
+        """Returns statistics of the compiled locator cache as a dictionary.
+
+        Parsed locators and the XPath expressions generated for the default
+        locator strategy are cached, so repeated lookups with the same
+        locator skip all string processing. The returned dictionary contains
+        `hits`, `misses`, `size` and `maxsize` of the locator cache and
+        `xpath_hits`, `xpath_misses` and `xpath_size` of the XPath cache.
+
+        See also `Set Locator Cache Size`.
+        """
+        statistics = self._element_finder.get_cache_statistics()
+        self._info("Locator cache statistics: %s" % ', '.join(
+            "%s=%s" % (name, statistics[name]) for name in sorted(statistics)))
+        return statistics
+
+    def set_locator_cache_size(self, size):
+        """Sets the maximum number of cached compiled locators and returns the previous size.
+
+        The least recently used locators are dropped when the cache is full.
+        Size 0 disables caching. The default size is 512.
+
+        Example:
+        | ${orig size} = | Set Locator Cache Size | 5000 |
+
+        See also `Get Locator Cache Statistics`.
+        """
+        old_size = self._element_finder.get_cache_size()
+        self._element_finder.set_cache_size(int(size))
+        return old_size
+
+    def get_locator_statistics(self, limit=10):
+        """Returns timing statistics of the element lookups done so far.
+
+        Every lookup records its wall time, the number of WebDriver commands
+        it sent to the browser and the number of elements it found, both per
+        locator and per locator strategy. The returned dictionary contains
+        `strategies`, a dictionary of statistics per strategy, and `slowest`
+        and `most_used`, lists of at most `limit` locators ordered by total
+        lookup time and by number of lookups. Each statistics entry has
+        `calls`, `total_time`, `mean_time` and `max_time` in seconds,
+        `round_trips`, `results` and a wall time `histogram`.
+
+        The same information is also logged as a readable report.
+
+        Example:
+        | ${stats} = | Get Locator Statistics | limit=5 |
+        | Log | ${stats['slowest'][0]['locator']} |
+
+        See also `Reset Locator Statistics` and `Set Locator Statistics Report`.
+        """
+        statistics = self._element_finder.statistics
+        self._info(statistics.format_report(limit))
+        return {'strategies': statistics.get_strategies(),
+                'slowest': statistics.get_slowest(limit),
+                'most_used': statistics.get_most_used(limit)}
+
+    def reset_locator_statistics(self):
+        """Discards the element lookup statistics collected so far.
+
+        See `Get Locator Statistics` for more information.
+        """
+        self._element_finder.statistics.clear()
+
+    def set_locator_statistics_report(self, path, limit=10):
+        """Writes a locator statistics report to `path` when the current suite ends.
+
+        The report lists lookup times per locator strategy and the `limit`
+        slowest and most frequently used locators, see `Get Locator
+        Statistics`. See `introduction` for how `path` is resolved.
+
+        Example:
+        | Set Locator Statistics Report | locators.txt | limit=20 |
+        """
+        self._write_report_when_suite_ends(path, 'Locator statistics',
+                                           self._element_finder.statistics.format_report, limit)
+
+    def set_element_cache(self, enabled):
+        """Sets whether elements found with a locator are reused by later keywords.
+
+        When enabled, the element found for a locator is remembered for the
+        current browser, window and frame. Keywords using the same locator
+        later reuse it as long as it is still attached to the page, which is
+        verified with one lightweight WebDriver call. A detached element is
+        found again transparently.
+
+        Checking a cached element costs as much as finding an element with
+        one WebDriver call, so only lookups that need more are cached. These
+        are `dom`, `jquery` and `sizzle` locators, custom locators, and
+        locators with a strategy prefix used by keywords that check the tag
+        name or attributes of the found element, such as `Select Checkbox`
+        with `id=agree`. Locators without a strategy prefix, and for example
+        `id=foo` or `css=div.result` used with `Click Element`, are always
+        found again.
+
+        The cache is emptied whenever a command that may change the page is
+        sent to the browser, for example when navigating, clicking or
+        typing. If the page changes by itself so that a locator would match
+        another element that is still attached, use `Clear Element Cache`.
+
+        `enabled` is considered false if it is an empty string or one of
+        `False`, `No`, `Off`, `0` or `None` (case-insensitive). Returns the
+        previous value. The cache is disabled by default.
+
+        Example:
+        | Set Element Cache | True |
+        | Wait Until Element Is Visible | jquery=div.result:first | # element is found |
+        | Element Should Be Enabled | jquery=div.result:first | # cached element is reused |
+        | Element Text Should Be | jquery=div.result:first | Done | # cached element is reused |
+        """
+        old_value = self._element_finder.cache_elements
+        self._element_finder.cache_elements = utils.is_truthy(enabled)
+        return old_value
+
+    def clear_element_cache(self):
+        """Removes the elements cached for the current browser.
+
+        See `Set Element Cache` for details.
+        """
+        self._element_finder.clear_element_cache(self._current_browser())
+
+    def get_element_cache_statistics(self):
+        """Returns statistics of the element cache as a dictionary.
+
+        The dictionary contains the number of `hits`, `misses` and `stale`
+        cached elements that had to be found again. See `Set Element Cache`
+        for details.
+        """
+        statistics = self._element_finder.get_element_cache_statistics()
+        self._info("Element cache statistics: %s" % ', '.join(
+            "%s=%s" % (name, statistics[name]) for name in sorted(statistics)))
+        return statistics
+
     # Private
 
     def _element_find(self, locator, first_only, required, tag=None):
         browser = self._current_browser()
         if isstr(locator):
-            elements = self._element_finder.find(browser, locator, tag)
+            elements = self._element_finder.find(browser, locator, tag, first_only)
             if required and len(elements) == 0:
                 raise ValueError("Element locator '" + locator + "' did not match any elements.")
             if first_only:
@@ -697,6 +1016,26 @@ return !element.dispatchEvent(evt);
         # ... or raise locator/element specific error if required
         return elements
 
+    def _element_find_many(self, locators, tag=None):
+        return self._element_finder.find_many(
+            self._current_browser(), self._as_locator_list(locators), tag)
+
+    def _as_locator_list(self, locators):
+        if isstr(locators):
+            return [locators]
+        return list(locators)
+
+    def _import_location_strategy(self, name):
+        module_name, _, function_name = name.rpartition('.')
+        if not module_name:
+            raise ValueError("Location strategy function '%s' must be given in format "
+                             "'module.function'." % name)
+        module = importlib.import_module(module_name)
+        try:
+            return getattr(module, function_name)
+        except AttributeError:
+            raise ValueError("Module '%s' has no function '%s'." % (module_name, function_name))
+
     def _frame_contains(self, locator, text):
         browser = self._current_browser()
         element = self._element_find(locator, True, True)
@@ -781,6 +1120,32 @@ return !element.dispatchEvent(evt);
     def _is_element_present(self, locator, tag=None):
         return (self._element_find(locator, True, False, tag=tag) is not None)
 
+    def _is_element_present_now(self, locator, tag=None):
+        with self._implicit_wait_disabled():
+            return self._is_element_present(locator, tag)
+
+    def _is_text_present_now(self, text):
+        with self._implicit_wait_disabled():
+            return self._is_text_present(text)
+
+    def _page_contains_now(self, text):
+        with self._implicit_wait_disabled():
+            return self._page_contains(text)
+
+    @contextmanager
+    def _implicit_wait_disabled(self):
+        # Absence checks must not wait for elements that are not expected to appear
+        browser = self._current_browser()
+        implicit_wait = browser.get_implicit_wait()
+        if implicit_wait == 0:
+            yield
+            return
+        browser.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            browser.implicitly_wait(implicit_wait)
+
     def _page_contains(self, text):
         browser = self._current_browser()
         browser.switch_to_default_content()
@@ -811,7 +1176,7 @@ return !element.dispatchEvent(evt);
 
     def _page_should_not_contain_element(self, locator, tag, message, loglevel):
         element_name = tag if tag is not None else 'element'
-        if self._is_element_present(locator, tag):
+        if self._is_element_present_now(locator, tag):
             if not message:
                 message = "Page should not have contained %s '%s'"\
                            % (element_name, locator)
@@ -13,6 +13,7 @@ class _FormElementKeywords(KeywordGroup):
         Key attributes for forms are `id` and `name`. See `introduction` for
         details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Submitting form '%s'." % locator)
         if not locator:
             locator = 'xpath=//form'
@@ -74,6 +75,7 @@ class _FormElementKeywords(KeywordGroup):
         checkboxes are `id` and `name`. See `introduction` for details about
         locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Selecting checkbox '%s'." % locator)
         element = self._get_checkbox(locator)
         if not element.is_selected():
@@ -86,6 +88,7 @@ class _FormElementKeywords(KeywordGroup):
         checkboxes are `id` and `name`. See `introduction` for details about
         locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Unselecting checkbox '%s'." % locator)
         element = self._get_checkbox(locator)
         if element.is_selected():
@@ -158,6 +161,7 @@ class _FormElementKeywords(KeywordGroup):
         | Select Radio Button | size | XL | # Matches HTML like <input type="radio" name="size" value="XL">XL</input> |
         | Select Radio Button | size | sizeXL | # Matches HTML like <input type="radio" name="size" value="XL" id="sizeXL">XL</input> |
         """
+        self._wait_for_page_idle_before_action()
         self._info("Selecting '%s' from radio button '%s'." % (value, group_name))
         element = self._get_radio_button_with_value(group_name, value)
         if not element.is_selected():
@@ -175,6 +179,7 @@ class _FormElementKeywords(KeywordGroup):
         Example:
         | Choose File | my_upload_field | /home/user/files/trades.csv |
         """
+        self._wait_for_page_idle_before_action()
         if not os.path.isfile(file_path):
             raise AssertionError("File '%s' does not exist on the local file system"
                         % file_path)
@@ -187,6 +192,7 @@ class _FormElementKeywords(KeywordGroup):
         does not log the given password. See `introduction` for details about
         locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Typing password into text field '%s'" % locator)
         self._input_text_into_text_field(locator, text)
 
@@ -195,6 +201,7 @@ class _FormElementKeywords(KeywordGroup):
 
         See `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Typing text '%s' into text field '%s'" % (text, locator))
         self._input_text_into_text_field(locator, text)
 
@@ -300,6 +307,7 @@ class _FormElementKeywords(KeywordGroup):
         Key attributes for buttons are `id`, `name` and `value`. See
         `introduction` for details about locating elements.
         """
+        self._wait_for_page_idle_before_action()
         self._info("Clicking button '%s'." % locator)
         element = self._element_find(locator, True, False, 'input')
         if element is None:
@@ -1,8 +1,10 @@
+import codecs
 import os
 import sys
 from robot.api import logger
 from keywordgroup import KeywordGroup
 from robot.libraries.BuiltIn import BuiltIn
+from Selenium2Library import utils
 
 try:
     from robot.libraries.BuiltIn import RobotNotRunningError
@@ -29,6 +31,24 @@ class _LoggingKeywords(KeywordGroup):
         except RobotNotRunningError:
             return os.getcwd()
 
+    def _get_output_path(self, path):
+        # Relative to the log directory, with missing directories created
+        path = os.path.join(self._get_log_dir(), path.replace('/', os.sep))
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        return path
+
+    def _write_report_when_suite_ends(self, path, name, format_report, *args):
+        suite = BuiltIn().get_variable_value('${SUITE NAME}')
+        utils.events.on('scope_end', suite, self._write_report, path, name, format_report, *args)
+
+    def _write_report(self, path, name, format_report, *args):
+        path = self._get_output_path(path)
+        with codecs.open(path, 'w', encoding='UTF-8') as report:
+            report.write(format_report(*args))
+        self._info("%s report written to '%s'." % (name, path))
+
     def _html(self, message):
         logger.info(message, True, False)
 
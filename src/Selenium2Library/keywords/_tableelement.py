@@ -1,3 +1,4 @@
+import csv
 import os
 import sys
 from Selenium2Library.locators import TableElementFinder
@@ -6,7 +7,7 @@ from keywordgroup import KeywordGroup
 class _TableElementKeywords(KeywordGroup):
 
     def __init__(self):
-        self._table_element_finder = TableElementFinder()
+        self._table_element_finder = TableElementFinder(getattr(self, '_element_finder', None))
 
     # Public
 
@@ -19,31 +20,130 @@ class _TableElementKeywords(KeywordGroup):
         or footer rows can be obtained with this keyword. To understand how
         tables are identified, please take a look at the `introduction`.
 
+        The column can also be given as the text of its header cell, see
+        `Table Column Should Contain`.
+
         See `Page Should Contain` for explanation about `loglevel` argument.
+
+        Example:
+        | ${status} = | Get Table Cell | orders | 2 | Status |
         """
         row = int(row)
         row_index = row
         if row > 0: row_index = row - 1
-        column = int(column)
-        column_index = column
-        if column > 0: column_index = column - 1
-        table = self._table_element_finder.find(self._current_browser(), table_locator)
-        if table is not None:
-            rows = table.find_elements_by_xpath("./thead/tr")
-            if row_index >= len(rows) or row_index < 0:
-                rows.extend(table.find_elements_by_xpath("./tbody/tr"))
-            if row_index >= len(rows) or row_index < 0:
-                rows.extend(table.find_elements_by_xpath("./tfoot/tr"))
-            if row_index < len(rows):
-                columns = rows[row_index].find_elements_by_tag_name('th')
-                if column_index >= len(columns) or column_index < 0:
-                    columns.extend(rows[row_index].find_elements_by_tag_name('td'))
-                if column_index < len(columns):
-                    return columns[column_index].text
+        try:
+            column_index = int(column)
+        except ValueError:
+            content = self._table_element_finder.get_cell_by_header(
+                self._current_browser(), table_locator, row_index, column)
+        else:
+            if column_index > 0: column_index = column_index - 1
+            content = self._table_element_finder.get_cell(
+                self._current_browser(), table_locator, row_index, column_index)
+        if content is not None:
+            return content
         self.log_source(loglevel)
         raise AssertionError("Cell in table %s in row #%s and column #%s could not be found."
             % (table_locator, str(row), str(column)))
 
+    def get_table_snapshot(self, table_locator, loglevel='INFO'):
+        """Returns the texts of all cells of a table.
+
+        The whole table is read with one JavaScript call, so the number of
+        round trips to the browser does not depend on the size of the table.
+
+        The result is a list of rows ordered like in `Get Table Cell`: header
+        rows first, then body rows and finally footer rows. Each row is a
+        dictionary containing `section` (`thead`, `tbody`, `tfoot` or `table`),
+        `cells`, the cell texts in document order, and `tags`, telling
+        whether each cell is a `th` or a `td` element.
+
+        See `Page Should Contain` for explanation about `loglevel` argument.
+
+        Example:
+        | ${rows} = | Get Table Snapshot | orders |
+        | Should Be Equal | ${rows[1]['cells'][0]} | 1001 |
+        """
+        rows = self._table_element_finder.get_snapshot(self._current_browser(), table_locator)
+        if rows is None:
+            self.log_source(loglevel)
+            raise AssertionError("Table identified by '%s' could not be found." % table_locator)
+        return rows
+
+    def export_table_to_csv(self, table_locator, path, chunk_size=500, delimiter=',', loglevel='INFO'):
+        """Writes the cell texts of a table to a CSV file and returns the number of written rows.
+
+        The table is read from the browser `chunk_size` rows at a time and
+        each chunk is written to the file before the next one is read, so
+        even tables with tens of thousands of rows can be exported without
+        holding them in memory or transferring them in one huge response.
+        Rows are written in the order used by `Get Table Snapshot`, one cell
+        text per column, encoded as UTF-8.
+
+        See `introduction` for how `path` is resolved. `delimiter` can be
+        used to write e.g. tab separated files.
+
+        See `Page Should Contain` for explanation about `loglevel` argument.
+
+        Example:
+        | ${count} = | Export Table To Csv | reportTable | report.csv | chunk_size=1000 |
+        | Export Table To Csv | reportTable | report.tsv | delimiter=\\t |
+        """
+        rows = self._table_element_finder.iter_rows(self._current_browser(), table_locator, chunk_size)
+        if rows is None:
+            self.log_source(loglevel)
+            raise AssertionError("Table identified by '%s' could not be found." % table_locator)
+        path = self._get_output_path(path)
+        count = 0
+        with open(path, 'wb') as csv_file:
+            writer = csv.writer(csv_file, delimiter=str(delimiter))
+            for row in rows:
+                writer.writerow([cell.encode('UTF-8') for cell in row['cells']])
+                count += 1
+        self._html("Wrote %d rows of table '%s' to '<a href=\"file://%s\">%s</a>'."
+                   % (count, table_locator, path, path))
+        return count
+
+    def table_should_match(self, table_locator, expected, tolerance=0, section=None, loglevel='INFO'):
+        """Verifies that the cell texts of a table equal `expected`.
+
+        `expected` can be a list of rows, each a list of cell values, or a
+        path to a CSV file. Files with the extension `.tsv` are read as tab
+        separated values. Files are expected to be encoded as UTF-8.
+
+        The table is read with one JavaScript call, see `Get Table Snapshot`,
+        and all its cells are compared with the expected values. Rows and
+        cells are aligned by their position. If some cells differ or the
+        table has missing or extra rows or cells, the keyword fails and lists
+        all of the differences at once.
+
+        If `tolerance` is given, cells whose expected and actual values are
+        both numbers are considered equal when they differ at most by
+        `tolerance`. `section` can be used to compare only the rows of a
+        certain part of the table, for example `tbody` to ignore the header
+        and footer rows.
+
+        See `Page Should Contain` for explanation about `loglevel` argument.
+
+        Examples:
+        | Table Should Match | orders | ${CURDIR}/expected_orders.csv | section=tbody |
+        | Table Should Match | prices | ${expected rows} | tolerance=0.01 |
+        """
+        rows = self._table_element_finder.get_snapshot(self._current_browser(), table_locator)
+        if rows is None:
+            self.log_source(loglevel)
+            raise AssertionError("Table identified by '%s' could not be found." % table_locator)
+        actual = [row['cells'] for row in rows if section is None or row['section'] == section]
+        if isinstance(expected, basestring):
+            expected = self._read_expected_table(expected)
+        differences = self._get_table_differences(actual, expected, float(tolerance))
+        if differences:
+            self.log_source(loglevel)
+            raise AssertionError("Table identified by '%s' did not match, %d difference%s:\n%s"
+                                 % (table_locator, len(differences),
+                                    's' if len(differences) != 1 else '', '\n'.join(differences)))
+        self._info("Table identified by '%s' matched %d expected rows." % (table_locator, len(expected)))
+
     def table_cell_should_contain(self, table_locator, row, column, expected, loglevel='INFO'):
         """Verifies that a certain cell in a table contains `expected`.
 
@@ -52,7 +152,8 @@ class _TableElementKeywords(KeywordGroup):
         that the cell content matches exactly, or that it e.g. starts
         with some text, use `Get Table Cell` keyword in combination
         with built-in keywords such as `Should Be Equal` or `Should
-        Start With`.
+        Start With`. The column can also be given as the text of its
+        header cell, see `Table Column Should Contain`.
 
         To understand how tables are identified, please take a look at
         the `introduction`.
@@ -87,6 +188,14 @@ class _TableElementKeywords(KeywordGroup):
         | Table Column Should Contain | tableId | 3 | C |
         | Table Column Should Contain | tableId | 2 | C |
 
+        Instead of a number, the column can be given as the text of its
+        header cell. The header row is the first row containing `th` cells,
+        or the first row if there is none. Header positions are read once
+        and reused until the page or the contents of the table change.
+
+        Example:
+        | Table Column Should Contain | orders | Status | Shipped |
+
         To understand how tables are identified, please take a look at
         the `introduction`.
 
@@ -168,3 +277,45 @@ class _TableElementKeywords(KeywordGroup):
             self.log_source(loglevel)
             raise AssertionError("Table identified by '%s' should have contained text '%s'." \
                 % (table_locator, expected))
+
+    # Private
+
+    def _read_expected_table(self, path):
+        delimiter = '\t' if path.lower().endswith('.tsv') else ','
+        with open(path, 'rb') as data_file:
+            return [[cell.decode('UTF-8') for cell in row]
+                    for row in csv.reader(data_file, delimiter=delimiter)]
+
+    def _get_table_differences(self, actual, expected, tolerance):
+        differences = []
+        for row_index in range(max(len(actual), len(expected))):
+            if row_index >= len(expected):
+                differences.append("Row #%d: unexpected row %s" % (row_index + 1, actual[row_index]))
+                continue
+            if row_index >= len(actual):
+                differences.append("Row #%d: missing row %s" % (row_index + 1, list(expected[row_index])))
+                continue
+            actual_row, expected_row = actual[row_index], expected[row_index]
+            for column_index in range(max(len(actual_row), len(expected_row))):
+                if column_index >= len(expected_row):
+                    differences.append("Row #%d, column #%d: unexpected cell '%s'"
+                                       % (row_index + 1, column_index + 1, actual_row[column_index]))
+                elif column_index >= len(actual_row):
+                    differences.append("Row #%d, column #%d: missing cell '%s'"
+                                       % (row_index + 1, column_index + 1, expected_row[column_index]))
+                elif not self._cells_match(actual_row[column_index], expected_row[column_index], tolerance):
+                    differences.append("Row #%d, column #%d: expected '%s' but was '%s'"
+                                       % (row_index + 1, column_index + 1,
+                                          expected_row[column_index], actual_row[column_index]))
+        return differences
+
+    def _cells_match(self, actual, expected, tolerance):
+        expected = unicode(expected).strip()
+        if actual == expected:
+            return True
+        if tolerance > 0:
+            try:
+                return abs(float(actual) - float(expected)) <= tolerance
+            except ValueError:
+                return False
+        return False
@@ -1,11 +1,256 @@
 import time
 import robot
+from contextlib import contextmanager
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
+from Selenium2Library import utils
+from Selenium2Library.locators.elementfinder import BROWSER_FUNCTIONS
 from keywordgroup import KeywordGroup
 
 class _WaitingKeywords(KeywordGroup):
 
+    wait_engines = ('python', 'browser')
+
+    # Condition names accepted by Wait Until Any and Wait Until All, mapped
+    # to (condition type, negated, arguments).
+    wait_conditions = {
+        'page contains': ('text', False, ('text',)),
+        'page does not contain': ('text', True, ('text',)),
+        'page contains element': ('element', False, ('locator',)),
+        'page does not contain element': ('element', True, ('locator',)),
+        'element is visible': ('visible', False, ('locator',)),
+        'element is not visible': ('visible', True, ('locator',)),
+        'element is enabled': ('enabled', False, ('locator',)),
+        'element contains': ('contains', False, ('locator', 'text')),
+        'element does not contain': ('contains', True, ('locator', 'text')),
+    }
+
+    # Waits until any or all, as told by arguments[1], of the conditions in
+    # arguments[0] hold or arguments[2] milliseconds have passed. The
+    # conditions are checked on every DOM mutation and animation frame.
+    # Calls back with [fired, states], where each state is
+    # [condition holds, element found, element text].
+    _browser_wait_script = BROWSER_FUNCTIONS + """
+var conditions = arguments[0], mode = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1];
+var deadline = new Date().getTime() + timeout, finished = false, observer = null;
+function s2lText(element) {
+    var text = element.innerText !== undefined ? element.innerText : element.textContent;
+    return text || '';
+}
+function s2lVisible(element) {
+    if (element.getClientRects().length === 0) return false;
+    var style = window.getComputedStyle(element);
+    return style.visibility !== 'hidden' && style.opacity !== '0';
+}
+function s2lCheck(condition) {
+    if (condition.type === 'text') {
+        var root = document.documentElement;
+        var present = root !== null && (root.textContent || '').indexOf(condition.text) !== -1;
+        return [present, present, null];
+    }
+    var found = s2lFind(condition.query);
+    if (found.length === 0) return [false, false, null];
+    var element = found[0];
+    if (condition.type === 'element') return [true, true, null];
+    if (condition.type === 'visible') return [s2lVisible(element), true, null];
+    if (condition.type === 'enabled') return [!element.disabled && element.getAttribute('disabled') === null, true, null];
+    var text = s2lText(element);
+    return [text.indexOf(condition.text) !== -1, true, text];
+}
+function s2lEvaluate() {
+    var fired = mode === 'all', states = [];
+    for (var i = 0; i < conditions.length; i++) {
+        var state = s2lCheck(conditions[i]);
+        if (conditions[i].negate) state[0] = !state[0];
+        fired = mode === 'all' ? fired && state[0] : fired || state[0];
+        states.push(state);
+    }
+    return [fired, states];
+}
+function s2lFinish(result) {
+    finished = true;
+    if (observer !== null) observer.disconnect();
+    done(result);
+}
+function s2lTick() {
+    if (finished) return;
+    var result = s2lEvaluate();
+    if (result[0] || new Date().getTime() >= deadline) s2lFinish(result);
+}
+var nextFrame = window.requestAnimationFrame ?
+    function (callback) { window.requestAnimationFrame(callback); } :
+    function (callback) { window.setTimeout(callback, 16); };
+function s2lLoop() {
+    s2lTick();
+    if (!finished) nextFrame(s2lLoop);
+}
+s2lLoop();
+if (!finished) {
+    if (window.MutationObserver) {
+        observer = new MutationObserver(s2lTick);
+        observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+    // Animation frames are paused in background tabs
+    window.setTimeout(function () { if (!finished) s2lFinish(s2lEvaluate()); }, timeout);
+}
+"""
+
+    # Installs a tracker counting pending XHR and fetch requests, timers of
+    # at most one second and running CSS transitions, unless the page has
+    # one already. Then waits until the page has been idle for arguments[0]
+    # milliseconds or arguments[1] milliseconds have passed, and calls back
+    # with [idle, descriptions of what kept the page busy].
+    _page_idle_script = """
+var quietPeriod = arguments[0], timeout = arguments[1];
+var done = arguments[arguments.length - 1];
+if (!window.s2lIdleTracker) {
+    var tracker = window.s2lIdleTracker = {
+        requests: 0, timers: 0, transitions: 0, lastChange: new Date().getTime(), lastBusy: 0,
+        setTimeout: window.setTimeout, clearTimeout: window.clearTimeout
+    };
+    var change = function (name, delta) {
+        tracker[name] = Math.max(tracker[name] + delta, 0);
+        tracker.lastChange = new Date().getTime();
+    };
+    var pendingTimers = {};
+    window.setTimeout = function (callback, delay) {
+        if (typeof callback !== 'function' || delay > 1000) return tracker.setTimeout.apply(window, arguments);
+        var args = Array.prototype.slice.call(arguments, 2), id;
+        id = tracker.setTimeout.call(window, function () {
+            if (pendingTimers[id]) {
+                delete pendingTimers[id];
+                change('timers', -1);
+            }
+            return callback.apply(this, args);
+        }, delay);
+        pendingTimers[id] = true;
+        change('timers', 1);
+        return id;
+    };
+    window.clearTimeout = function (id) {
+        if (pendingTimers[id]) {
+            delete pendingTimers[id];
+            change('timers', -1);
+        }
+        return tracker.clearTimeout.apply(window, arguments);
+    };
+    if (window.XMLHttpRequest) {
+        var send = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function () {
+            var finished = false;
+            change('requests', 1);
+            this.addEventListener('loadend', function () {
+                if (!finished) change('requests', -1);
+                finished = true;
+            });
+            return send.apply(this, arguments);
+        };
+    }
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            change('requests', 1);
+            return fetch.apply(this, arguments).then(
+                function (response) { change('requests', -1); return response; },
+                function (error) { change('requests', -1); throw error; });
+        };
+    }
+    document.addEventListener('transitionrun', function () { change('transitions', 1); }, true);
+    document.addEventListener('transitionend', function () { change('transitions', -1); }, true);
+    document.addEventListener('transitioncancel', function () { change('transitions', -1); }, true);
+}
+var tracker = window.s2lIdleTracker, deadline = new Date().getTime() + timeout;
+function s2lBusy() {
+    var busy = [];
+    if (document.readyState !== 'complete') busy.push('document is ' + document.readyState);
+    if (tracker.requests > 0) busy.push(tracker.requests + ' pending request(s)');
+    if (window.jQuery && window.jQuery.active > 0) busy.push(window.jQuery.active + ' active jQuery request(s)');
+    if (tracker.timers > 0) busy.push(tracker.timers + ' pending timer(s)');
+    if (tracker.transitions > 0) busy.push(tracker.transitions + ' running transition(s)');
+    return busy;
+}
+function s2lCheckIdle() {
+    var busy = s2lBusy(), now = new Date().getTime();
+    if (busy.length > 0) tracker.lastBusy = now;
+    if (busy.length === 0 && now - Math.max(tracker.lastBusy, tracker.lastChange) >= quietPeriod) return done([true, []]);
+    if (now >= deadline) return done([false, busy]);
+    tracker.setTimeout.call(window, s2lCheckIdle, 50);
+}
+s2lCheckIdle();
+"""
+
+    def __init__(self):
+        self._poll_strategy = utils.PollStrategy()
+        self._wait_engine = 'python'
+        self._page_idle_wait = None
+        self._wait_statistics = utils.WaitStatistics()
+        self._wait_polls = 0
+
     # Public
 
+    def set_wait_poll_strategy(self, strategy='fixed', interval=None, max_interval=None, factor=2):
+        """Sets how often `Wait ...` keywords check their condition and returns the previous strategy.
+
+        `strategy` is one of the following:
+        | = Strategy =  | = Behavior = |
+        | fixed         | Checks the condition every `interval`, by default every 0.2 seconds. |
+        | exponential   | Starts with `interval` (default 0.05 seconds) and doubles the time between checks, or multiplies it by `factor`, up to `max_interval` (default 1 second). |
+        | jitter        | Like `exponential`, but every sleep is a random time between half and all of the exponential interval, so that parallel test runs do not poll in lockstep. |
+
+        `interval` and `max_interval` can be given in Robot Framework time
+        format. The strategy can also be set when the library is imported,
+        see `importing`. The number of checks and the time each wait took
+        are logged on DEBUG level.
+
+        Examples:
+        | Set Wait Poll Strategy | exponential | 50 ms | 2 s |
+        | ${previous} = | Set Wait Poll Strategy | fixed | 0.5 s |
+        """
+        old_strategy = str(self._poll_strategy)
+        self._poll_strategy = utils.PollStrategy(
+            strategy,
+            robot.utils.timestr_to_secs(interval) if interval is not None else None,
+            robot.utils.timestr_to_secs(max_interval) if max_interval is not None else None,
+            factor)
+        return old_strategy
+
+    def set_wait_engine(self, engine='python'):
+        """Sets where `Wait ...` keywords check their condition and returns the previous engine.
+
+        `engine` is one of the following:
+        | = Engine = | = Behavior = |
+        | python     | Checks the condition with WebDriver commands, sleeping between the checks as set with `Set Wait Poll Strategy`. This is the default. |
+        | browser    | Sends the whole wait to the browser as one asynchronous script that checks the condition whenever the page changes and on every animation frame. |
+
+        With the `browser` engine a wait is a single WebDriver round trip and
+        notices the condition within one frame. Waits longer than the script
+        timeout, which is the same as the Selenium timeout by default, take
+        one round trip per script timeout. It is used by `Wait Until
+        Page Contains`, `Wait Until Page Does Not Contain`, `Wait Until Page
+        Contains Element`, `Wait Until Page Does Not Contain Element`, `Wait
+        Until Element Is Visible`, `Wait Until Element Is Not Visible`, `Wait
+        Until Element Is Enabled`, `Wait Until Element Contains`, `Wait
+        Until Element Does Not Contain`, `Wait Until Any` and `Wait Until
+        All`. Locators that cannot be resolved in
+        the browser, such as custom locators and `dom` or `jquery` locators,
+        and browsers that fail to run the script fall back to the `python`
+        engine, using the time left of the wait. The engine can also be set
+        when the library is imported, see `importing`.
+
+        Examples:
+        | Set Wait Engine | browser |
+        | ${previous} = | Set Wait Engine | python |
+        """
+        engine = engine.strip().lower()
+        if engine not in self.wait_engines:
+            raise ValueError("Wait engine '%s' is not supported. Available engines are %s."
+                             % (engine, ', '.join(self.wait_engines)))
+        old_engine = self._wait_engine
+        self._wait_engine = engine
+        return old_engine
+
     def wait_for_condition(self, condition, timeout=None, error=None):
         """Waits until the given `condition` is true or `timeout` expires.
 
@@ -25,8 +270,9 @@ class _WaitingKeywords(KeywordGroup):
         """
         if not error:
             error = "Condition '%s' did not become true in <TIMEOUT>" % condition
-        self._wait_until(timeout, error,
-                         lambda: self._current_browser().execute_script(condition) == True)
+        with self._recorded_wait('Wait For Condition', condition, timeout):
+            self._wait_until(timeout, error, None,
+                             lambda: self._current_browser().execute_script(condition) == True)
 
     def wait_until_page_contains(self, text, timeout=None, error=None):
         """Waits until `text` appears on current page.
@@ -43,7 +289,9 @@ class _WaitingKeywords(KeywordGroup):
         """
         if not error:
             error = "Text '%s' did not appear in <TIMEOUT>" % text
-        self._wait_until(timeout, error, self._is_text_present, text)
+        with self._recorded_wait('Wait Until Page Contains', text, timeout):
+            self._wait_until(timeout, error, [self._condition('text', text=text)],
+                             self._is_text_present, text)
 
     def wait_until_page_does_not_contain(self, text, timeout=None, error=None):
         """Waits until `text` disappears from current page.
@@ -64,7 +312,9 @@ class _WaitingKeywords(KeywordGroup):
                 return
             else:
                 return error or "Text '%s' did not disappear in %s" % (text, self._format_timeout(timeout))
-        self._wait_until_no_error(timeout, check_present)
+        with self._recorded_wait('Wait Until Page Does Not Contain', text, timeout):
+            self._wait_until_conditions(timeout, [self._condition('text', text=text, negate=True)],
+                                        check_present, disable_implicit_wait=True)
 
     def wait_until_page_contains_element(self, locator, timeout=None, error=None):
         """Waits until element specified with `locator` appears on current page.
@@ -81,7 +331,9 @@ class _WaitingKeywords(KeywordGroup):
         """
         if not error:
             error = "Element '%s' did not appear in <TIMEOUT>" % locator
-        self._wait_until(timeout, error, self._is_element_present, locator)
+        with self._recorded_wait('Wait Until Page Contains Element', locator, timeout):
+            self._wait_until(timeout, error, [self._condition('element', locator)],
+                             self._is_element_present, locator)
 
     def wait_until_page_does_not_contain_element(self, locator, timeout=None, error=None):
         """Waits until element specified with `locator` disappears from current page.
@@ -102,7 +354,9 @@ class _WaitingKeywords(KeywordGroup):
                 return
             else:
                 return error or "Element '%s' did not disappear in %s" % (locator, self._format_timeout(timeout))
-        self._wait_until_no_error(timeout, check_present)
+        with self._recorded_wait('Wait Until Page Does Not Contain Element', locator, timeout):
+            self._wait_until_conditions(timeout, [self._condition('element', locator, negate=True)],
+                                        check_present, disable_implicit_wait=True)
 
     def wait_until_element_is_visible(self, locator, timeout=None, error=None):
         """Waits until element specified with `locator` is visible.
@@ -125,7 +379,8 @@ class _WaitingKeywords(KeywordGroup):
                 return error or "Element locator '%s' did not match any elements after %s" % (locator, self._format_timeout(timeout))
             else:
                 return error or "Element '%s' was not visible in %s" % (locator, self._format_timeout(timeout))
-        self._wait_until_no_error(timeout, check_visibility)
+        with self._recorded_wait('Wait Until Element Is Visible', locator, timeout):
+            self._wait_until_conditions(timeout, [self._condition('visible', locator)], check_visibility)
     
     def wait_until_element_is_not_visible(self, locator, timeout=None, error=None):
         """Waits until element specified with `locator` is not visible.
@@ -148,7 +403,9 @@ class _WaitingKeywords(KeywordGroup):
                 return error or "Element locator '%s' did not match any elements after %s" % (locator, self._format_timeout(timeout))
             else:
                 return error or "Element '%s' was still visible in %s" % (locator, self._format_timeout(timeout))
-        self._wait_until_no_error(timeout, check_hidden)
+        with self._recorded_wait('Wait Until Element Is Not Visible', locator, timeout):
+            self._wait_until_conditions(timeout, [self._condition('visible', locator, negate=True)],
+                                        check_hidden)
 
     def wait_until_element_is_enabled(self, locator, timeout=None, error=None):
         """Waits until element specified with `locator` is enabled.
@@ -174,7 +431,8 @@ class _WaitingKeywords(KeywordGroup):
             else:
                 return error or "Element '%s' was not enabled in %s" % (locator, self._format_timeout(timeout))
 
-        self._wait_until_no_error(timeout, check_enabled)
+        with self._recorded_wait('Wait Until Element Is Enabled', locator, timeout):
+            self._wait_until_conditions(timeout, [self._condition('enabled', locator)], check_enabled)
 
     def wait_until_element_contains(self, locator, text, timeout=None, error=None):
         """Waits until given element contains `text`.
@@ -183,21 +441,28 @@ class _WaitingKeywords(KeywordGroup):
         `introduction` for more information about `timeout` and its
         default value.
 
+        If the page replaces the element while waiting, for example when a
+        framework renders it again, the element is found again using
+        `locator`.
+
         `error` can be used to override the default error message.
 
         See also `Wait Until Page Contains`, `Wait Until Page Contains Element`, `Wait For Condition`,
         `Wait Until Element Is Visible` and BuiltIn keyword `Wait Until
         Keyword Succeeds`.
         """
-        element = self._element_find(locator, True, True)
+        elements = [self._element_find(locator, True, True)]
         def check_text():
-            actual = element.text
-            if text in actual:
+            actual = self._get_current_text(locator, elements)
+            if actual is None:
+                return error or "Element locator '%s' did not match any elements after %s" % (locator, self._format_timeout(timeout))
+            elif text in actual:
                 return
             else:
                 return error or "Text '%s' did not appear in %s to element '%s'. " \
                             "Its text was '%s'." % (text, self._format_timeout(timeout), locator, actual)
-        self._wait_until_no_error(timeout, check_text)
+        with self._recorded_wait('Wait Until Element Contains', locator, timeout):
+            self._wait_until_conditions(timeout, [self._condition('contains', locator, text)], check_text)
 
 
     def wait_until_element_does_not_contain(self, locator, text, timeout=None, error=None):
@@ -207,38 +472,438 @@ class _WaitingKeywords(KeywordGroup):
         `introduction` for more information about `timeout` and its
         default value.
 
+        If the page replaces the element while waiting, for example when a
+        framework renders it again, the element is found again using
+        `locator`.
+
         `error` can be used to override the default error message.
 
         See also `Wait Until Page Contains`, `Wait Until Page Contains Element`, `Wait For Condition`,
         `Wait Until Element Is Visible` and BuiltIn keyword `Wait Until
         Keyword Succeeds`.
         """
-        element = self._element_find(locator, True, True)
+        elements = [self._element_find(locator, True, True)]
         def check_text():
-            actual = element.text
-            if not text in actual:
+            actual = self._get_current_text(locator, elements)
+            if actual is None:
+                return error or "Element locator '%s' did not match any elements after %s" % (locator, self._format_timeout(timeout))
+            elif not text in actual:
                 return
             else:
                 return error or "Text '%s' did not disappear in %s from element '%s'." % (text, self._format_timeout(timeout), locator)
-        self._wait_until_no_error(timeout, check_text)
+        with self._recorded_wait('Wait Until Element Does Not Contain', locator, timeout):
+            self._wait_until_conditions(timeout, [self._condition('contains', locator, text, negate=True)],
+                                        check_text)
+
+    def wait_until_any(self, *conditions):
+        """Waits until any of the given `conditions` is true and returns the number of that condition.
+
+        Every condition is given as its name followed by its arguments. The
+        names and arguments are the same as those of the corresponding
+        `Wait Until ...` keywords:
+        | = Condition =                  | = Arguments = |
+        | page contains                  | text |
+        | page does not contain          | text |
+        | page contains element          | locator |
+        | page does not contain element  | locator |
+        | element is visible             | locator |
+        | element is not visible         | locator |
+        | element is enabled             | locator |
+        | element contains               | locator, text |
+        | element does not contain       | locator, text |
+
+        All conditions are checked together on every check, and the whole
+        wait is bounded by one timeout. The timeout and an error message
+        overriding the default one can be given last using `timeout=<value>`
+        and `error=<message>` syntax. See `introduction` for more information
+        about `timeout` and its default value.
+
+        The returned number is the position of the first true condition,
+        starting from 1. With the `browser` engine (see `Set Wait Engine`)
+        all conditions are checked in one script.
+
+        Examples:
+        | ${state} = | Wait Until Any | element is visible | css=.results | element is visible | css=.empty | page contains | Error | timeout=10 s |
+        | Run Keyword If | ${state} == 3 | Fail | The search failed |
+
+        See also `Wait Until All`.
+        """
+        (conditions, descriptions, timeout, error) = self._parse_conditions(conditions)
+        with self._recorded_wait('Wait Until Any', ', '.join(descriptions), timeout):
+            holds = self._wait_until_many(timeout, conditions, 'any', lambda holds: error or
+                                          "None of the conditions became true in %s: %s."
+                                          % (self._format_timeout(timeout), ', '.join(descriptions)))
+        index = holds.index(True)
+        self._info("Condition %d, %s, became true." % (index + 1, descriptions[index]))
+        return index + 1
+
+    def wait_until_all(self, *conditions):
+        """Waits until all of the given `conditions` are true at the same time.
+
+        The conditions, `timeout` and `error` are given like with `Wait
+        Until Any`. The error message lists the conditions that were not
+        true when the timeout expired.
+
+        Example:
+        | Wait Until All | element is not visible | id=spinner | element is enabled | id=save | timeout=5 s |
+        """
+        (conditions, descriptions, timeout, error) = self._parse_conditions(conditions)
+        with self._recorded_wait('Wait Until All', ', '.join(descriptions), timeout):
+            self._wait_until_many(timeout, conditions, 'all', lambda holds: error or
+                                  "Conditions did not become true in %s: %s."
+                                  % (self._format_timeout(timeout),
+                                     ', '.join(description for description, held
+                                               in zip(descriptions, holds) if not held)))
+
+    def wait_for_page_idle(self, timeout=None, quiet_period='0.5 seconds', error=None):
+        """Waits until the current page has been idle for `quiet_period`.
+
+        The page is idle when its document has been loaded completely and it
+        has no pending XHR or fetch requests, no active jQuery requests, no
+        pending timers of at most one second and no running CSS transitions.
+        To know about requests and timers the keyword installs a small
+        tracker into the page the first time it is used on that page. The
+        first wait on each page thus cannot see requests, timers and
+        transitions already in progress, only the loading of the document
+        and active jQuery requests. Timers that keep rescheduling themselves
+        keep the page busy. If the page is left while
+        waiting, for example because a clicked button submitted a form, the
+        wait continues once on the new page.
+
+        Fails if `timeout` expires before the page is idle, listing what kept
+        it busy. See `introduction` for more information about `timeout` and
+        its default value. `error` can be used to override the default error
+        message.
+
+        See also `Set Page Idle Wait`.
+
+        Examples:
+        | Click Button | Search |
+        | Wait For Page Idle |
+        | Wait For Page Idle | 10 s | quiet_period=200 ms |
+        """
+        with self._recorded_wait('Wait For Page Idle', 'page', timeout):
+            busy = self._wait_for_page_idle(timeout, quiet_period)
+            if busy is not None:
+                raise AssertionError(error or "Page did not become idle in %s: %s."
+                                     % (self._format_timeout(timeout), busy))
+
+    def set_page_idle_wait(self, enabled, quiet_period='0.5 seconds'):
+        """Sets whether actions wait for the page to be idle before they are done.
+
+        When enabled, keywords that act on elements, such as `Click
+        Element`, `Click Button`, `Input Text`, `Select Checkbox` and `Submit
+        Form`, first wait like `Wait For Page Idle` with the given
+        `quiet_period` and the default timeout. If the page does not become
+        idle, a warning is logged and the action is done anyway. As
+        explained with `Wait For Page Idle`, the first wait on a page cannot
+        see requests and timers the page started before it, so on a newly
+        loaded page the first action may not wait for them.
+
+        `enabled` is considered false if it is an empty string or one of
+        `False`, `No`, `Off`, `0` or `None` (case-insensitive). Returns the
+        previous value. The wait is disabled by default.
+
+        Example:
+        | Set Page Idle Wait | True | 200 ms |
+        | Click Button | Search | # waits until the page is idle before clicking |
+        """
+        old_value = self._page_idle_wait is not None
+        if utils.is_truthy(enabled):
+            self._page_idle_wait = robot.utils.timestr_to_secs(quiet_period)
+        else:
+            self._page_idle_wait = None
+        return old_value
+
+    def get_wait_statistics(self):
+        """Returns statistics of the waits done so far, one entry per keyword and target.
+
+        Every `Wait ...` keyword records how long it waited, how many times
+        it checked its condition and whether it `passed`, `timed out` or
+        `failed` otherwise. The target is the locator, text or condition the
+        keyword waited for. Each returned entry has `keyword`, `target`,
+        `calls`, `outcomes`, `total_time`, `mean_time`, `max_time`,
+        `p50_time` and `p99_time` in seconds, `polls`, the longest timeout
+        used as `max_timeout`, a wall time `histogram` and a
+        `suggested_timeout`.
+
+        The suggested timeout is the 99th percentile of the waits that
+        passed multiplied by 1.5, but at least one second. It is empty if no
+        wait passed. Comparing it with `max_timeout` shows which waits have
+        much longer timeouts than they need. After 1000 passed waits of one
+        target the percentiles are estimated from a random sample of 1000
+        waits, which keeps memory usage bounded in long runs.
+
+        Example:
+        | ${waits} = | Get Wait Statistics |
+        | Log | ${waits[0]['suggested_timeout']} |
+
+        See also `Reset Wait Statistics` and `Set Wait Statistics Report`.
+        """
+        return self._wait_statistics.get_sites()
+
+    def reset_wait_statistics(self):
+        """Discards the wait statistics collected so far.
+
+        See `Get Wait Statistics` for more information.
+        """
+        self._wait_statistics.clear()
+
+    def set_wait_statistics_report(self, path):
+        """Writes the wait statistics as JSON to `path` when the current suite ends.
+
+        The report contains the entries returned by `Get Wait Statistics`
+        under `waits` and the upper bounds of the histogram buckets under
+        `buckets`. See `introduction` for how `path` is resolved.
+
+        Example:
+        | Set Wait Statistics Report | waits.json |
+        """
+        self._write_report_when_suite_ends(path, 'Wait statistics', self._wait_statistics.format_json)
 
     # Private
 
-    def _wait_until(self, timeout, error, function, *args):
+    @contextmanager
+    def _recorded_wait(self, keyword, target, timeout):
+        timeout = robot.utils.timestr_to_secs(timeout) if timeout is not None else self._timeout_in_secs
+        self._wait_polls = 0
+        started = time.time()
+        outcome = 'failed'
+        try:
+            yield
+            outcome = 'passed'
+        except AssertionError:
+            outcome = 'timed out'
+            raise
+        finally:
+            self._wait_statistics.record(keyword, target, time.time() - started,
+                                         self._wait_polls, outcome, timeout)
+
+    def _wait_for_page_idle_before_action(self):
+        if self._page_idle_wait is None:
+            return
+        try:
+            busy = self._wait_for_page_idle(None, self._page_idle_wait)
+        except Exception as err:
+            # The action reports its own errors, this wait only helps it
+            busy = 'waiting failed: %s' % err
+        if busy is not None:
+            self._warn("Page did not become idle in %s before the action: %s."
+                       % (self._format_timeout(None), busy))
+
+    def _wait_for_page_idle(self, timeout, quiet_period):
+        # Returns None when the page became idle, otherwise what kept it busy
+        timeout = robot.utils.timestr_to_secs(timeout) if timeout is not None else self._timeout_in_secs
+        quiet_period = robot.utils.timestr_to_secs(quiet_period)
+        browser = self._current_browser()
+        started = time.time()
+        try:
+            idle, busy = self._run_page_idle_script(browser, quiet_period, timeout)
+        except WebDriverException as err:
+            # The page navigated while the script ran, so it is retried once
+            # on the new document, which gets a tracker of its own.
+            remaining = timeout - (time.time() - started)
+            self._debug("Waiting for page idle was interrupted: %s" % err)
+            idle, busy = False, ['page changed while waiting']
+            if remaining > 0:
+                try:
+                    idle, busy = self._run_page_idle_script(browser, quiet_period, remaining)
+                except WebDriverException as err:
+                    self._debug("Waiting for page idle was interrupted: %s" % err)
+        self._debug("Waiting for page idle %s in %.3f seconds."
+                    % ('succeeded' if idle else 'timed out', time.time() - started))
+        if idle:
+            return None
+        return ', '.join(busy) or 'activity during the quiet period'
+
+    def _run_page_idle_script(self, browser, quiet_period, timeout):
+        def run_script(wait):
+            try:
+                return browser.execute_async_script(
+                    self._page_idle_script, int(quiet_period * 1000), int(wait * 1000))
+            except TimeoutException:
+                return False, []
+        return self._run_in_browser(browser, timeout, run_script)
+
+    def _wait_until(self, timeout, error, conditions, function, *args):
         error = error.replace('<TIMEOUT>', self._format_timeout(timeout))
         def wait_func():
             return None if function(*args) else error
-        self._wait_until_no_error(timeout, wait_func)
+        self._wait_until_conditions(timeout, conditions, wait_func)
+
+    def _wait_until_conditions(self, timeout, conditions, wait_func, disable_implicit_wait=False):
+        started = time.time()
+        holds = self._wait_in_browser(timeout, conditions, 'all')
+        if holds is not None and all(holds):
+            return
+        if not disable_implicit_wait:
+            self._check_conditions(timeout, started, holds, wait_func)
+            return
+        # Absent elements must not make checks wait implicitly, and switching
+        # the implicit wait once for all checks saves two commands per check
+        with self._implicit_wait_disabled():
+            self._check_conditions(timeout, started, holds, wait_func)
+
+    def _check_conditions(self, timeout, started, holds, wait_func):
+        if holds is None:
+            self._wait_until_no_error(self._get_time_left(timeout, started), wait_func)
+            return
+        # The error message comes from a final check with WebDriver
+        timeout_error = wait_func()
+        if timeout_error:
+            raise AssertionError(timeout_error)
+
+    def _condition(self, type, locator=None, text=None, negate=False):
+        return {'type': type, 'locator': locator, 'text': text, 'negate': negate}
+
+    def _parse_conditions(self, arguments):
+        conditions, descriptions = [], []
+        options = {'timeout': None, 'error': None}
+        arguments = list(arguments)
+        while arguments:
+            argument = arguments.pop(0)
+            (option, separator, value) = argument.partition('=')
+            if separator and option.strip().lower() in options:
+                options[option.strip().lower()] = value
+                continue
+            name = ' '.join(argument.lower().split())
+            if name not in self.wait_conditions:
+                raise ValueError("Wait condition '%s' is not supported. Available conditions are %s."
+                                 % (argument, ', '.join(sorted(self.wait_conditions))))
+            (type, negate, argument_names) = self.wait_conditions[name]
+            if len(arguments) < len(argument_names):
+                raise ValueError("Wait condition '%s' requires %d argument%s."
+                                 % (name, len(argument_names), '' if len(argument_names) == 1 else 's'))
+            values = dict(zip(argument_names, arguments[:len(argument_names)]))
+            del arguments[:len(argument_names)]
+            conditions.append(self._condition(type, values.get('locator'), values.get('text'), negate))
+            descriptions.append("%s '%s'" % (name, "', '".join(values[arg] for arg in argument_names)))
+        if not conditions:
+            raise ValueError("At least one wait condition must be given.")
+        return conditions, descriptions, options['timeout'], options['error']
+
+    def _wait_until_many(self, timeout, conditions, mode, get_error):
+        started = time.time()
+        holds = self._wait_in_browser(timeout, conditions, mode)
+        fired = any if mode == 'any' else all
+        if holds is not None:
+            if not fired(holds):
+                raise AssertionError(get_error(holds))
+            return holds
+        holds = []
+        def check_conditions():
+            holds[:] = [self._check_condition(condition) for condition in conditions]
+            return None if fired(holds) else get_error(holds)
+        # Absent elements must not make every check wait implicitly
+        with self._implicit_wait_disabled():
+            self._wait_until_no_error(self._get_time_left(timeout, started), check_conditions)
+        return holds
+
+    def _check_condition(self, condition):
+        (type, locator, text) = (condition['type'], condition['locator'], condition['text'])
+        if type == 'text':
+            holds = self._is_text_present(text)
+        elif type == 'element':
+            holds = self._is_element_present(locator)
+        elif type == 'visible':
+            holds = bool(self._is_visible(locator))
+        else:
+            element = self._element_find(locator, True, False)
+            if element is None:
+                holds = False
+            elif type == 'enabled':
+                holds = not element.get_attribute('disabled')
+            else:
+                holds = text in element.text
+        return holds != condition['negate']
+
+    def _wait_in_browser(self, timeout, conditions, mode):
+        # Returns which conditions hold when the wait in the browser ended,
+        # or None if the wait must be done with WebDriver
+        if self._wait_engine != 'browser' or not conditions:
+            return None
+        browser = self._current_browser()
+        browser_conditions = []
+        for condition in conditions:
+            query = None
+            if condition['locator'] is not None:
+                query = self._element_finder.get_browser_query(browser, condition['locator'])
+                if query is None:
+                    return None
+            browser_conditions.append({'type': condition['type'], 'query': query,
+                                       'text': condition['text'], 'negate': condition['negate']})
+        timeout = robot.utils.timestr_to_secs(timeout) if timeout is not None else self._timeout_in_secs
+        started = time.time()
+        def run_script(wait):
+            try:
+                return browser.execute_async_script(
+                    self._browser_wait_script, browser_conditions, mode, int(wait * 1000))
+            except TimeoutException:
+                return False, [[False]] * len(conditions)
+        try:
+            fired, states = self._run_in_browser(browser, timeout, run_script)
+        except WebDriverException as err:
+            self._debug("Waiting in the browser failed, polling with WebDriver instead: %s" % err)
+            return None
+        self._debug("Wait %s in the browser in %.3f seconds."
+                    % ('succeeded' if fired else 'timed out', time.time() - started))
+        return [state[0] for state in states]
+
+    def _run_in_browser(self, browser, timeout, run_script):
+        # Scripts that wait in the browser stop by themselves a margin before
+        # the script timeout, and longer waits run the script again. The
+        # script timeout of browsers not opened with Open Browser is unknown
+        # and is set once like Open Browser does.
+        script_timeout = browser.get_script_timeout()
+        if script_timeout is None:
+            script_timeout = self._timeout_in_secs
+            browser.set_script_timeout(script_timeout)
+        longest = script_timeout - min(0.5, script_timeout / 2.0)
+        deadline = time.time() + timeout
+        time_left = timeout
+        while True:
+            wait = min(time_left, longest)
+            self._wait_polls += 1
+            result = run_script(wait)
+            time_left = deadline - time.time()
+            if result[0] or wait < longest or time_left <= 0:
+                return result
+
+    def _get_time_left(self, timeout, started):
+        timeout = robot.utils.timestr_to_secs(timeout) if timeout is not None else self._timeout_in_secs
+        return max(timeout - (time.time() - started), 0)
+
+    def _get_current_text(self, locator, elements):
+        # Finds the element again when the page has replaced it since the previous check
+        if elements[0] is not None:
+            try:
+                return elements[0].text
+            except StaleElementReferenceException:
+                self._debug("Element '%s' became stale, finding it again." % locator)
+        elements[0] = self._element_find(locator, True, False)
+        return elements[0].text if elements[0] is not None else None
 
     def _wait_until_no_error(self, timeout, wait_func, *args):
         timeout = robot.utils.timestr_to_secs(timeout) if timeout is not None else self._timeout_in_secs
-        maxtime = time.time() + timeout
+        started = time.time()
+        maxtime = started + timeout
+        polls = 0
         while True:
-            timeout_error = wait_func(*args)
-            if not timeout_error: return
-            if time.time() > maxtime:
+            try:
+                timeout_error = wait_func(*args)
+            except StaleElementReferenceException as err:
+                # The page replaced the element during the check, the next check finds it again
+                timeout_error = "Element became stale during the wait: %s" % (err.msg or 'no details')
+            polls += 1
+            self._wait_polls += 1
+            now = time.time()
+            if not timeout_error or now > maxtime:
+                self._debug("Wait %s after %d poll%s in %.3f seconds using %s poll strategy."
+                            % ('timed out' if timeout_error else 'succeeded', polls,
+                               '' if polls == 1 else 's', now - started, self._poll_strategy))
+                if not timeout_error: return
                 raise AssertionError(timeout_error)
-            time.sleep(0.2)
+            time.sleep(min(self._poll_strategy.get_interval(polls - 1), maxtime - now))
 
     def _format_timeout(self, timeout):
         timeout = robot.utils.timestr_to_secs(timeout) if timeout is not None else self._timeout_in_secs
@@ -2,10 +2,14 @@ from elementfinder import ElementFinder
 from tableelementfinder import TableElementFinder
 from windowmanager import WindowManager
 from customlocator import CustomLocator
+from locatoroptimizer import LocatorOptimizer
+from locatorstatistics import LocatorStatistics
 
 __all__ = [
     "ElementFinder",
     "TableElementFinder",
     "WindowManager",
-    "CustomLocator"
+    "CustomLocator",
+    "LocatorOptimizer",
+    "LocatorStatistics"
 ]
@@ -1,4 +1,6 @@
 from robot.libraries.BuiltIn import BuiltIn
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.webelement import WebElement
 
 try:
     string_type = basestring
@@ -7,11 +9,37 @@ except NameError:
 
 class CustomLocator(object):
 
-    def __init__(self, name, finder):
+    def __init__(self, name, finder, memoize=False):
         self.name = name
         self.finder = finder
+        self.memoize = memoize
 
     def find(self, *args):
+        if not self.memoize:
+            return self._find(*args)
+
+        # Results are remembered until the page in the browser changes.
+        # Nothing found is not remembered, so waits see elements appear.
+        browser, criteria, tag, constraints = args
+        results = browser.get_page_cache().setdefault('custom_locators', {})
+        key = (self.name, criteria, tag, tuple(sorted(constraints.items())))
+        if key in results and self._is_attached(results[key][0]):
+            return list(results[key])
+        results.pop(key, None)
+        elements = self._find(*args)
+        if len(elements) > 0:
+            results[key] = list(elements)
+        return elements
+
+    def _is_attached(self, element):
+        if not isinstance(element, WebElement):
+            return True
+        try:
+            return element.tag_name is not None
+        except StaleElementReferenceException:
+            return False
+
+    def _find(self, *args):
 
         # Allow custom locators to be keywords or normal methods
         if isinstance(self.finder, string_type):
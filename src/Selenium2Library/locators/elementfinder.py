@@ -1,11 +1,61 @@
+import time
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
 from Selenium2Library import utils
 from robot.api import logger
 from robot.utils import NormalizedDict
+from locatoroptimizer import LocatorOptimizer
+from locatorstatistics import LocatorStatistics
+
+
+# JavaScript functions shared by the scripts that find or filter elements in
+# the browser. s2lFind takes a query created by ElementFinder.get_browser_query.
+BROWSER_FUNCTIONS = """
+function s2lMatches(element, tag, constraints) {
+    if (!element || !element.tagName || element.tagName.toLowerCase() !== tag) return false;
+    for (var name in constraints) {
+        var value = element[name];
+        if (value === undefined || value === null) value = element.getAttribute(name);
+        if (value === undefined || value === null || String(value) !== constraints[name]) return false;
+    }
+    return true;
+}
+function s2lAttributeSelector(name, value) {
+    return '[' + name + '="' + value.replace(/(["\\\\])/g, '\\\\$1') + '"]';
+}
+function s2lNodes(using, value) {
+    if (using === 'xpath') {
+        var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+        return nodes;
+    }
+    if (using === 'css') return document.querySelectorAll(value);
+    if (using === 'class') return document.getElementsByClassName(value);
+    if (using === 'tag') return document.getElementsByTagName(value);
+    return document.querySelectorAll(s2lAttributeSelector(using, value));
+}
+function s2lFind(query) {
+    var found = [];
+    for (var i = 0; i < query.queries.length; i++) {
+        var nodes = s2lNodes(query.queries[i][0], query.queries[i][1]);
+        for (var j = 0; j < nodes.length; j++) {
+            var node = nodes[j];
+            if (node.nodeType !== 1) continue;
+            if (query.tag === null || s2lMatches(node, query.tag, query.constraints)) found.push(node);
+        }
+    }
+    return found;
+}
+"""
 
 
 class ElementFinder(object):
 
-    def __init__(self):
+    def __init__(self, filter_in_browser=False, cache_size=512, cache_elements=False,
+                 optimize_locators=False):
         strategies = {
             'identifier': self._find_by_identifier,
             'id': self._find_by_id,
@@ -24,18 +74,116 @@ class ElementFinder(object):
         }
         self._strategies = NormalizedDict(initial=strategies, caseless=True, spaceless=True)
         self._default_strategies = list(strategies.keys())
-
-    def find(self, browser, locator, tag=None):
+        single_strategies = {
+            'identifier': self._find_first_by_identifier,
+            'id': self._find_first_by(By.ID),
+            'name': self._find_first_by(By.NAME),
+            'xpath': self._find_first_by(By.XPATH),
+            'link': self._find_first_by(By.LINK_TEXT),
+            'partial link': self._find_first_by(By.PARTIAL_LINK_TEXT),
+            'css': self._find_first_by(By.CSS_SELECTOR),
+            'class': self._find_first_by(By.CLASS_NAME),
+            'tag': self._find_first_by(By.TAG_NAME),
+            'default': self._find_first_by_default
+        }
+        self._single_strategies = NormalizedDict(initial=single_strategies, caseless=True, spaceless=True)
+        browser_queries = {
+            'identifier': self._get_identifier_queries,
+            'id': self._get_queries_using('id'),
+            'name': self._get_queries_using('name'),
+            'xpath': self._get_queries_using('xpath'),
+            'css': self._get_queries_using('css'),
+            'class': self._get_queries_using('class'),
+            'tag': self._get_queries_using('tag'),
+            'default': self._get_default_queries
+        }
+        self._browser_queries = NormalizedDict(initial=browser_queries, caseless=True, spaceless=True)
+        self.filter_in_browser = filter_in_browser
+        self._locator_cache = utils.LRUCache(cache_size)
+        self._xpath_cache = utils.LRUCache(cache_size)
+        self.cache_elements = cache_elements
+        self.selector_engine_source = None
+        self.optimize_locators = optimize_locators
+        self._optimizer = LocatorOptimizer()
+        self._element_cache_statistics = {'hits': 0, 'misses': 0, 'stale': 0}
+        self.statistics = LocatorStatistics(self._get_strategy_name)
+
+    def find(self, browser, locator, tag=None, first_only=False):
         assert browser is not None
         assert locator is not None and len(locator) > 0
 
-        (prefix, criteria) = self._parse_locator(locator)
-        prefix = 'default' if prefix is None else prefix
-        strategy = self._strategies.get(prefix)
-        if strategy is None:
+        started = time.time()
+        commands = self._get_command_count(browser)
+        if first_only and self.cache_elements and self._is_worth_caching(locator, tag):
+            elements = self._find_first_cached(browser, locator, tag)
+        else:
+            elements = self._find(browser, locator, tag, first_only)
+        self.statistics.record(locator, time.time() - started,
+                               self._get_command_count(browser) - commands, len(elements))
+        return elements
+
+    def find_many(self, browser, locators, tag=None):
+        assert browser is not None
+        results = {}
+        queries = []
+        for locator in locators:
+            assert locator is not None and len(locator) > 0
+            query = self.get_browser_query(browser, locator, tag)
+            if query is None:
+                results[locator] = self.find(browser, locator, tag)
+            else:
+                queries.append((locator, query))
+        if len(queries) > 0:
+            try:
+                found = browser.execute_script(self._find_many_script, [query for _, query in queries])
+            except WebDriverException as err:
+                logger.debug("Batch find failed, finding locators one by one: %s" % err)
+                found = None
+            if not isinstance(found, list) or len(found) != len(queries):
+                if found is not None:
+                    logger.debug("Batch find returned %s, finding locators one by one." % found)
+                for locator, _ in queries:
+                    results[locator] = self.find(browser, locator, tag)
+                return results
+            for (locator, _), elements in zip(queries, found):
+                results[locator] = self._normalize_result(elements)
+        return results
+
+    def get_browser_query(self, browser, locator, tag=None):
+        (prefix, criteria, tag, constraints) = self._compile_locator(locator, tag)
+        if self._strategies.get(prefix) is None:
             raise ValueError("Element locator with prefix '" + prefix + "' is not supported")
-        (tag, constraints) = self._get_tag_and_constraints(tag)
-        return strategy(browser, criteria, tag, constraints)
+        get_queries = self._browser_queries.get(prefix)
+        if get_queries is None:
+            return None
+        (queries, filtered) = get_queries(browser, criteria, tag, constraints)
+        return {'queries': queries,
+                'tag': tag if filtered else None,
+                'constraints': dict(constraints)}
+
+    def get_cache_size(self):
+        return self._locator_cache.maxsize
+
+    def set_cache_size(self, size):
+        self._locator_cache.maxsize = size
+        self._xpath_cache.maxsize = size
+
+    def get_cache_statistics(self):
+        statistics = self._locator_cache.get_statistics()
+        xpath_statistics = self._xpath_cache.get_statistics()
+        for name in ('hits', 'misses', 'size'):
+            statistics['xpath_' + name] = xpath_statistics[name]
+        return statistics
+
+    def clear_cache(self):
+        self._locator_cache.clear()
+        self._xpath_cache.clear()
+
+    def get_element_cache_statistics(self):
+        return dict(self._element_cache_statistics)
+
+    def clear_element_cache(self, browser):
+        browser.get_page_cache().pop('elements', None)
 
     def register(self, strategy, persist):
         if strategy.name in self._strategies:
@@ -55,29 +203,118 @@ class ElementFinder(object):
         else:
             del self._strategies[strategy_name]
 
+    def clear_custom_locator_cache(self, browser, strategy_name=None):
+        results = browser.get_page_cache().get('custom_locators', {})
+        for key in list(results):
+            if strategy_name is None or key[0] == strategy_name:
+                del results[key]
+
     def has_strategy(self, strategy_name):
         return strategy_name in self.strategies
 
+    # Locator resolution, private
+
+    def _get_command_count(self, browser):
+        return browser.get_command_count() or 0
+
+    def _get_strategy_name(self, locator):
+        (prefix, criteria) = self._parse_locator(locator)
+        return 'default' if prefix is None else prefix.lower().replace(' ', '')
+
+    def _find(self, browser, locator, tag, first_only):
+        (prefix, criteria, tag, constraints) = self._compile_locator(locator, tag)
+        strategy = self._strategies.get(prefix)
+        if strategy is None:
+            raise ValueError("Element locator with prefix '" + prefix + "' is not supported")
+        constraints = dict(constraints)
+        if first_only and prefix in self._single_strategies:
+            elements = self._single_strategies[prefix](browser, criteria, tag, constraints)
+            if elements is not None:
+                return elements
+        return strategy(browser, criteria, tag, constraints)
+
+    # Browser query routines, private
+    #
+    # These return the (using, value) pairs s2lFind runs in the browser and
+    # whether the tag and constraints still need to be checked there.
+
+    def _get_queries_using(self, using):
+        def get_queries(browser, criteria, tag, constraints):
+            return [[using, criteria]], True
+        return get_queries
+
+    def _get_identifier_queries(self, browser, criteria, tag, constraints):
+        return [['xpath', self._get_identifier_xpath(criteria)]], True
+
+    def _get_default_queries(self, browser, criteria, tag, constraints):
+        if criteria.startswith('//'):
+            return [['xpath', criteria]], True
+        (by, value) = self._get_key_attrs_query(browser, criteria, tag, constraints)
+        return [['css' if by == By.CSS_SELECTOR else 'xpath', value]], False
+
+    _find_many_script = BROWSER_FUNCTIONS + """
+var queries = arguments[0], results = [];
+for (var i = 0; i < queries.length; i++) results.push(s2lFind(queries[i]));
+return results;
+"""
+
+    # Element cache, private
+
+    def _find_first_cached(self, browser, locator, tag):
+        cached_elements = browser.get_page_cache().setdefault('elements', {})
+        key = (locator, tag)
+        element = cached_elements.get(key)
+        if element is not None:
+            if self._is_attached(element):
+                self._element_cache_statistics['hits'] += 1
+                return [element]
+            self._element_cache_statistics['stale'] += 1
+            del cached_elements[key]
+        else:
+            self._element_cache_statistics['misses'] += 1
+        elements = self._find(browser, locator, tag, True)
+        if len(elements) > 0:
+            cached_elements[key] = elements[0]
+        return elements
+
+    def _is_worth_caching(self, locator, tag):
+        # Verifying a cached element costs one command, which is all that
+        # finding the first element with a native strategy costs. The
+        # default strategy has the tag and constraints in its query, other
+        # native strategies check them with more commands.
+        (prefix, criteria, tag, constraints) = self._compile_locator(locator, tag)
+        if self._strategies.get(prefix) == self._find_by_default:
+            return False
+        if prefix in self._single_strategies:
+            return tag is not None or len(constraints) > 0
+        return True
+
+    def _is_attached(self, element):
+        try:
+            return element.tag_name is not None
+        except StaleElementReferenceException:
+            return False
+
     # Strategy routines, private
 
     def _find_by_identifier(self, browser, criteria, tag, constraints):
-        elements = self._normalize_result(browser.find_elements_by_id(criteria))
-        elements.extend(self._normalize_result(browser.find_elements_by_name(criteria)))
-        return self._filter_elements(elements, tag, constraints)
+        return self._filter_elements(
+            browser, browser.find_elements_by_xpath(self._get_identifier_xpath(criteria)),
+            tag, constraints)
 
     def _find_by_id(self, browser, criteria, tag, constraints):
         return self._filter_elements(
-            browser.find_elements_by_id(criteria),
+            browser, browser.find_elements_by_id(criteria),
             tag, constraints)
 
     def _find_by_name(self, browser, criteria, tag, constraints):
         return self._filter_elements(
-            browser.find_elements_by_name(criteria),
+            browser, browser.find_elements_by_name(criteria),
             tag, constraints)
 
     def _find_by_xpath(self, browser, criteria, tag, constraints):
         return self._filter_elements(
-            browser.find_elements_by_xpath(criteria),
+            browser, browser.find_elements_by_xpath(criteria),
             tag, constraints)
 
     def _find_by_dom(self, browser, criteria, tag, constraints):
@@ -86,42 +323,77 @@ class ElementFinder(object):
             return []
         if not isinstance(result, list):
             result = [result]
-        return self._filter_elements(result, tag, constraints)
+        return self._filter_elements(browser, result, tag, constraints)
 
     def _find_by_sizzle_selector(self, browser, criteria, tag, constraints):
-        js = "return jQuery('%s').get();" % criteria.replace("'", "\\'")
-        return self._filter_elements(
-            browser.execute_script(js),
-            tag, constraints)
+        page_cache = browser.get_page_cache()
+        source = self.selector_engine_source
+        result = browser.execute_script(
+            self._sizzle_script, criteria, page_cache.get('selector_engine'), None, source is not None)
+        if self._is_selector_engine_missing(result):
+            result = browser.execute_script(self._sizzle_script, criteria, None, source, False)
+        if not isinstance(result, list) or len(result) != 2:
+            logger.debug("Sizzle selector returned %s" % result)
+            return []
+        (engine, elements) = result
+        if engine != page_cache.get('selector_engine'):
+            logger.debug("Using %s for sizzle selectors on this page." % engine)
+            page_cache['selector_engine'] = engine
+        return self._filter_elements(browser, elements, tag, constraints)
+
+    _sizzle_script = """
+var selector = arguments[0], engine = arguments[1], source = arguments[2], injectable = arguments[3];
+function s2lSelect(name) {
+    if (name === 'jQuery' && window.jQuery) return [name, window.jQuery(selector).get()];
+    if (name === 'Sizzle' && window.Sizzle) return [name, window.Sizzle(selector)];
+    if (name === 'querySelectorAll') return [name, Array.prototype.slice.call(document.querySelectorAll(selector))];
+    return null;
+}
+var result = engine ? s2lSelect(engine) : null;
+if (result) return result;
+if (source && !window.jQuery && !window.Sizzle) {
+    var script = document.createElement('script');
+    script.type = 'text/javascript';
+    script.text = source;
+    (document.head || document.documentElement).appendChild(script);
+}
+result = s2lSelect('jQuery') || s2lSelect('Sizzle');
+if (result) return result;
+if (injectable) return ['missing', null];
+return s2lSelect('querySelectorAll');
+"""
+
+    def _is_selector_engine_missing(self, result):
+        return isinstance(result, list) and len(result) == 2 and result[0] == 'missing'
 
     def _find_by_link_text(self, browser, criteria, tag, constraints):
         return self._filter_elements(
-            browser.find_elements_by_link_text(criteria),
+            browser, browser.find_elements_by_link_text(criteria),
             tag, constraints)
 
     def _find_by_partial_link_text(self, browser, criteria, tag, constraints):
         return self._filter_elements(
-            browser.find_elements_by_partial_link_text(criteria),
+            browser, browser.find_elements_by_partial_link_text(criteria),
             tag, constraints)
 
     def _find_by_css_selector(self, browser, criteria, tag, constraints):
         return self._filter_elements(
-            browser.find_elements_by_css_selector(criteria),
+            browser, browser.find_elements_by_css_selector(criteria),
             tag, constraints)
 
     def _find_by_class_name(self, browser, criteria, tag, constraints):
         return self._filter_elements(
-            browser.find_elements_by_class_name(criteria),
+            browser, browser.find_elements_by_class_name(criteria),
             tag, constraints)
 
     def _find_by_tag_name(self, browser, criteria, tag, constraints):
         return self._filter_elements(
-            browser.find_elements_by_tag_name(criteria),
+            browser, browser.find_elements_by_tag_name(criteria),
             tag, constraints)
 
     def _find_by_sc_locator(self, browser, criteria, tag, constraints):
         js = "return isc.AutoTest.getElement('%s')" % criteria.replace("'", "\\'")
-        return self._filter_elements([browser.execute_script(js)], tag, constraints)
+        return self._filter_elements(browser, [browser.execute_script(js)], tag, constraints)
 
     def _find_by_default(self, browser, criteria, tag, constraints):
         if criteria.startswith('//'):
@@ -129,6 +401,124 @@ class ElementFinder(object):
         return self._find_by_key_attrs(browser, criteria, tag, constraints)
 
     def _find_by_key_attrs(self, browser, criteria, tag, constraints):
+        (by, value) = self._get_key_attrs_query(browser, criteria, tag, constraints)
+        if by == By.CSS_SELECTOR:
+            return self._normalize_result(browser.find_elements_by_css_selector(value))
+        return self._normalize_result(browser.find_elements_by_xpath(value))
+
+    # Single element strategy routines, private
+    #
+    # These return a list with the first matching element, an empty list when
+    # nothing matches, or None when the first element found by the browser was
+    # rejected by the tag filter and the full strategy must be used instead.
+
+    def _find_first_by(self, by):
+        def find_first(browser, criteria, tag, constraints):
+            return self._accept_first(
+                browser, self._find_single(browser, by, criteria), tag, constraints)
+        return find_first
+
+    def _find_first_by_identifier(self, browser, criteria, tag, constraints):
+        return self._find_first_by(By.XPATH)(
+            browser, self._get_identifier_xpath(criteria), tag, constraints)
+
+    def _find_first_by_default(self, browser, criteria, tag, constraints):
+        if criteria.startswith('//'):
+            return self._find_first_by(By.XPATH)(browser, criteria, tag, constraints)
+        (by, value) = self._get_key_attrs_query(browser, criteria, tag, constraints)
+        element = self._find_single(browser, by, value)
+        return [element] if element is not None else []
+
+    def _find_single(self, browser, by, criteria):
+        try:
+            return browser.find_element(by, criteria)
+        except NoSuchElementException:
+            return None
+
+    def _accept_first(self, browser, element, tag, constraints):
+        if element is None:
+            return []
+        elements = self._filter_elements(browser, [element], tag, constraints)
+        return elements if len(elements) > 0 else None
+
+    # Private
+
+    def _compile_locator(self, locator, tag):
+        key = (locator, tag, self.optimize_locators)
+        plan = self._locator_cache.get(key)
+        if plan is None:
+            (prefix, criteria) = self._parse_locator(locator)
+            prefix = 'default' if prefix is None else prefix
+            if self.optimize_locators:
+                (prefix, criteria) = self._optimize_locator(prefix, criteria)
+            plan = (prefix, criteria) + self._get_tag_and_constraints(tag)
+            self._locator_cache.set(key, plan)
+        return plan
+
+    def _optimize_locator(self, prefix, criteria):
+        if self._strategies.get(prefix) == self._find_by_xpath or \
+                (self._strategies.get(prefix) == self._find_by_default and criteria.startswith('//')):
+            optimized = self._optimizer.optimize_xpath(criteria)
+            if optimized is not None:
+                return optimized
+        return (prefix, criteria)
+
+    def _get_key_attrs_query(self, browser, criteria, tag, constraints):
+        if self.optimize_locators:
+            css = self._get_key_attrs_css(browser, criteria, tag, constraints)
+            if css is not None:
+                return (By.CSS_SELECTOR, css)
+        return (By.XPATH, self._get_key_attrs_xpath(browser, criteria, tag, constraints))
+
+    def _get_key_attrs_css(self, browser, criteria, tag, constraints):
+        key = ('css', criteria, tag, tuple(sorted(constraints.items())))
+        template = self._xpath_cache.get(key)
+        if template is None:
+            template = self._compile_key_attrs_css(criteria, tag, constraints)
+            self._xpath_cache.set(key, template)
+        if template is False:
+            return None
+        (css_start, selectors, url_attrs) = template
+        if len(url_attrs) > 0:
+            url = self._get_base_url(browser) + "/" + criteria
+            if not self._optimizer.is_simple_value(url):
+                return None
+            selectors = selectors + [css_start + self._optimizer.css_attribute(attr, url)
+                                     for attr in url_attrs]
+        return ','.join(selectors)
+
+    def _compile_key_attrs_css(self, criteria, tag, constraints):
+        key_attrs = self._key_attrs.get(None)
+        if tag is not None:
+            key_attrs = self._key_attrs.get(tag, key_attrs)
+        values = [criteria] + list(constraints.values())
+        if not all(attr.startswith('@') for attr in key_attrs) or \
+                not all(self._optimizer.is_simple_value(value) for value in values):
+            return False
+        css_start = (tag or '') + ''.join(
+            self._optimizer.css_attribute(name, constraints[name]) for name in constraints)
+        selectors = [css_start + self._optimizer.css_attribute(attr[1:], criteria) for attr in key_attrs]
+        url_attrs = [attr[1:] for attr in ['@src', '@href'] if attr in key_attrs]
+        logger.debug("Using CSS selector '%s' instead of XPath for locator '%s'."
+                     % (','.join(selectors), criteria))
+        return (css_start, selectors, url_attrs)
+
+    def _get_identifier_xpath(self, criteria):
+        xpath_criteria = utils.escape_xpath_value(criteria)
+        return "//*[@id=%s or @name=%s]" % (xpath_criteria, xpath_criteria)
+
+    def _get_key_attrs_xpath(self, browser, criteria, tag, constraints):
+        key = (criteria, tag, tuple(sorted(constraints.items())))
+        template = self._xpath_cache.get(key)
+        if template is None:
+            template = self._compile_key_attrs_xpath(criteria, tag, constraints)
+            self._xpath_cache.set(key, template)
+        (xpath_start, xpath_searchers, url_key_attrs) = template
+        if url_key_attrs is not None:
+            xpath_searchers = xpath_searchers + self._get_attrs_with_url(url_key_attrs, criteria, browser)
+        return "%s(%s)]" % (xpath_start, ' or '.join(xpath_searchers))
+
+    def _compile_key_attrs_xpath(self, criteria, tag, constraints):
         key_attrs = self._key_attrs.get(None)
         if tag is not None:
             key_attrs = self._key_attrs.get(tag, key_attrs)
@@ -137,16 +527,11 @@ class ElementFinder(object):
         xpath_tag = tag if tag is not None else '*'
         xpath_constraints = ["@%s='%s'" % (name, constraints[name]) for name in constraints]
         xpath_searchers = ["%s=%s" % (attr, xpath_criteria) for attr in key_attrs]
-        xpath_searchers.extend(
-            self._get_attrs_with_url(key_attrs, criteria, browser))
-        xpath = "//%s[%s(%s)]" % (
+        xpath_start = "//%s[%s" % (
             xpath_tag,
-            ' and '.join(xpath_constraints) + ' and ' if len(xpath_constraints) > 0 else '',
-            ' or '.join(xpath_searchers))
-
-        return self._normalize_result(browser.find_elements_by_xpath(xpath))
-
-    # Private
+            ' and '.join(xpath_constraints) + ' and ' if len(xpath_constraints) > 0 else '')
+        url_key_attrs = key_attrs if '@src' in key_attrs or '@href' in key_attrs else None
+        return (xpath_start, xpath_searchers, url_key_attrs)
 
     _key_attrs = {
         None: ['@id', '@name'],
@@ -193,11 +578,26 @@ class ElementFinder(object):
                 return False
         return True
 
-    def _filter_elements(self, elements, tag, constraints):
+    def _filter_elements(self, browser, elements, tag, constraints):
         elements = self._normalize_result(elements)
         if tag is None: return elements
+        if self.filter_in_browser and len(elements) > 0:
+            return self._filter_elements_in_browser(browser, elements, tag, constraints)
         return [element for element in elements if self._element_matches(element, tag, constraints)]
 
+    _filter_script = BROWSER_FUNCTIONS + """
+var elements = arguments[0], tag = arguments[1], constraints = arguments[2];
+var matches = [];
+for (var i = 0; i < elements.length; i++) {
+    if (s2lMatches(elements[i], tag, constraints)) matches.push(elements[i]);
+}
+return matches;
+"""
+
+    def _filter_elements_in_browser(self, browser, elements, tag, constraints):
+        return self._normalize_result(
+            browser.execute_script(self._filter_script, elements, tag, constraints))
+
     def _get_attrs_with_url(self, key_attrs, criteria, browser):
         attrs = []
         url = None
@@ -211,9 +611,13 @@ class ElementFinder(object):
         return attrs
 
     def _get_base_url(self, browser):
-        url = browser.get_current_url()
-        if '/' in url:
-            url = '/'.join(url.split('/')[:-1])
+        page_cache = browser.get_page_cache()
+        url = page_cache.get('base_url')
+        if url is None:
+            url = browser.get_current_url()
+            if '/' in url:
+                url = '/'.join(url.split('/')[:-1])
+            page_cache['base_url'] = url
         return url
 
     def _parse_locator(self, locator):
@@ -0,0 +1,76 @@
+import re
+from robot.api import logger
+
+
+class LocatorOptimizer(object):
+    """Rewrites simple XPath expressions to faster id, name, tag or CSS lookups.
+
+    Only expressions that select elements anywhere in the document by their
+    tag name and attribute values are rewritten, for example
+    `//*[@id='foo']`, `//input[@name='q' and @type='text']` or
+    `//div[contains(@class,'x')]`. Anything else is left untouched.
+    """
+
+    _step = re.compile(r"^//(\*|[a-zA-Z][\w-]*)((?:\[[^\[\]]*\])*)$")
+    _predicate = re.compile(r"\[([^\[\]]*)\]")
+    _condition = re.compile(
+        r"\s*(?:@(?P<attr>[a-zA-Z][\w-]*)\s*=\s*(?P<quote>['\"])(?P<value>[^'\"\\\n]*)(?P=quote)"
+        r"|(?P<function>contains|starts-with)\(\s*@(?P<func_attr>[a-zA-Z][\w-]*)\s*,\s*"
+        r"(?P<func_quote>['\"])(?P<func_value>[^'\"\\\n]+)(?P=func_quote)\s*\))\s*")
+    _and = re.compile(r"and\b")
+    _css_operators = {None: '=', 'contains': '*=', 'starts-with': '^='}
+    _simple_value = re.compile(r"^[^'\"\\\n]*$")
+
+    def optimize_xpath(self, xpath):
+        """Returns `(strategy, criteria)` equivalent to `xpath` or None."""
+        match = self._step.match(xpath.strip())
+        if match is None:
+            return None
+        tag, predicates = match.groups()
+        conditions = []
+        for predicate in self._predicate.findall(predicates):
+            predicate_conditions = self._parse_conditions(predicate)
+            if predicate_conditions is None:
+                return None
+            conditions.extend(predicate_conditions)
+        optimized = self._to_locator(tag, conditions)
+        if optimized is not None:
+            logger.debug("Rewrote XPath locator '%s' to '%s=%s'." % ((xpath,) + optimized))
+        return optimized
+
+    def is_simple_value(self, value):
+        return self._simple_value.match(value) is not None
+
+    def css_attribute(self, name, value, function=None):
+        return '[%s%s"%s"]' % (name, self._css_operators[function], value)
+
+    def _parse_conditions(self, predicate):
+        conditions = []
+        position = 0
+        while True:
+            match = self._condition.match(predicate, position)
+            if match is None:
+                return None
+            if match.group('attr'):
+                conditions.append((match.group('attr'), match.group('value'), None))
+            else:
+                conditions.append((match.group('func_attr'), match.group('func_value'),
+                                   match.group('function')))
+            position = match.end()
+            if position == len(predicate):
+                return conditions
+            and_match = self._and.match(predicate, position)
+            if and_match is None:
+                return None
+            position = and_match.end()
+
+    def _to_locator(self, tag, conditions):
+        if len(conditions) == 0:
+            return ('tag', tag) if tag != '*' else None
+        if tag == '*' and len(conditions) == 1:
+            name, value, function = conditions[0]
+            if function is None and name in ('id', 'name') and value:
+                return (name, value)
+        css = '' if tag == '*' else tag
+        css += ''.join(self.css_attribute(*condition) for condition in conditions)
+        return ('css', css)
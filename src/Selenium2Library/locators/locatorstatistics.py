@@ -0,0 +1,107 @@
+import time
+
+
+class LocatorStatistics(object):
+    """Collects timing statistics of element lookups.
+
+    Every lookup is recorded both for the locator string and for the
+    strategy the locator uses. Recorded are the wall time, the number of
+    WebDriver commands sent to the browser and the number of found elements.
+    """
+
+    # Upper bounds of the wall time histogram buckets, in seconds.
+    buckets = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self, strategy_resolver):
+        self._resolve_strategy = strategy_resolver
+        self._locators = {}
+        self._strategies = {}
+
+    def record(self, locator, elapsed, round_trips, results):
+        entry = self._locators.get(locator)
+        if entry is None:
+            entry = self._locators[locator] = self._new_entry()
+            entry['strategy'] = self._resolve_strategy(locator)
+        strategy = self._strategies.get(entry['strategy'])
+        if strategy is None:
+            strategy = self._strategies[entry['strategy']] = self._new_entry()
+        for stats in (entry, strategy):
+            stats['calls'] += 1
+            stats['total_time'] += elapsed
+            stats['max_time'] = max(stats['max_time'], elapsed)
+            stats['round_trips'] += round_trips
+            stats['results'] += results
+            stats['histogram'][self._get_bucket(elapsed)] += 1
+
+    def get_strategies(self):
+        return dict((name, self._summarize(stats)) for name, stats in self._strategies.items())
+
+    def get_slowest(self, limit=10):
+        return self._get_top('total_time', limit)
+
+    def get_most_used(self, limit=10):
+        return self._get_top('calls', limit)
+
+    def clear(self):
+        self._locators.clear()
+        self._strategies.clear()
+
+    def format_report(self, limit=10):
+        lines = ['Locator statistics, %s' % time.strftime('%Y-%m-%d %H:%M:%S'), '']
+        lines.append('Strategies:')
+        lines.append(self._format_header('Strategy'))
+        strategies = self.get_strategies()
+        for name in sorted(strategies, key=lambda name: -strategies[name]['total_time']):
+            lines.append(self._format_row(name, strategies[name]))
+        for title, top in (('Slowest locators (by total time):', self.get_slowest(limit)),
+                           ('Most used locators:', self.get_most_used(limit))):
+            lines.extend(['', title, self._format_header('Locator')])
+            lines.extend(self._format_row(stats['locator'], stats) for stats in top)
+        lines.extend(['', 'Wall time histogram per strategy:'])
+        labels = ['<=%gs' % bound for bound in self.buckets] + ['>%gs' % self.buckets[-1]]
+        lines.append('%-20s %s' % ('Strategy', ' '.join('%8s' % label for label in labels)))
+        for name in sorted(strategies):
+            lines.append('%-20s %s' % (name, ' '.join(
+                '%8d' % count for count in strategies[name]['histogram'])))
+        return '\n'.join(lines) + '\n'
+
+    def _get_top(self, key, limit):
+        limit = int(limit)
+        top = sorted(self._locators.items(), key=lambda item: -item[1][key])
+        result = []
+        for locator, stats in top[:limit] if limit >= 0 else top:
+            summary = self._summarize(stats)
+            summary['locator'] = locator
+            summary['strategy'] = stats['strategy']
+            result.append(summary)
+        return result
+
+    def _summarize(self, stats):
+        return {'calls': stats['calls'],
+                'total_time': stats['total_time'],
+                'mean_time': stats['total_time'] / stats['calls'],
+                'max_time': stats['max_time'],
+                'round_trips': stats['round_trips'],
+                'results': stats['results'],
+                'histogram': list(stats['histogram'])}
+
+    def _new_entry(self):
+        return {'calls': 0, 'total_time': 0.0, 'max_time': 0.0, 'round_trips': 0,
+                'results': 0, 'histogram': [0] * (len(self.buckets) + 1)}
+
+    def _get_bucket(self, elapsed):
+        for index, bound in enumerate(self.buckets):
+            if elapsed <= bound:
+                return index
+        return len(self.buckets)
+
+    def _format_header(self, title):
+        return '%-40s %8s %10s %10s %10s %12s %8s' % (
+            title, 'Calls', 'Total (s)', 'Mean (ms)', 'Max (ms)', 'Round trips', 'Results')
+
+    def _format_row(self, name, stats):
+        if len(name) > 40:
+            name = name[:37] + '...'
+        return '%-40s %8d %10.3f %10.1f %10.1f %12d %8d' % (
+            name, stats['calls'], stats['total_time'], stats['mean_time'] * 1000,
+            stats['max_time'] * 1000, stats['round_trips'], stats['results'])
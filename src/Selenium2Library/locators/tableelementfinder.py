@@ -1,9 +1,72 @@
 from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import WebDriverException
+from robot.api import logger
 from Selenium2Library import utils
-from elementfinder import ElementFinder
+from elementfinder import ElementFinder, BROWSER_FUNCTIONS
 
 class TableElementFinder(object):
 
+    # Returns the rows start...end of the table in arguments[0] as
+    # [section, cell texts, cell tags] lists. Rows are ordered like in
+    # HTMLTableElement.rows: header rows first, then body rows, then footer rows.
+    _rows_script = """
+var rows = Array.prototype.slice.call(arguments[0].rows);
+var end = arguments[2] === null ? rows.length : arguments[2];
+var result = [];
+rows = rows.slice(arguments[1], end);
+for (var i = 0; i < rows.length; i++) {
+    var texts = [], tags = [];
+    for (var j = 0; j < rows[i].cells.length; j++) {
+        var cell = rows[i].cells[j];
+        var text = cell.innerText !== undefined ? cell.innerText : cell.textContent;
+        texts.push((text || '').replace(/^\\s+|\\s+$/g, ''));
+        tags.push(cell.tagName.toLowerCase());
+    }
+    result.push([rows[i].parentNode.tagName.toLowerCase(), texts, tags]);
+}
+return result;
+"""
+
+    # Returns the first element matched by the queries in arguments[0] whose
+    # text contains arguments[1], trying the queries in the given order.
+    _search_script = BROWSER_FUNCTIONS + """
+var queries = arguments[0], content = arguments[1];
+for (var i = 0; i < queries.length; i++) {
+    var found = s2lFind(queries[i]);
+    for (var j = 0; j < found.length; j++) {
+        var text = found[j].innerText !== undefined ? found[j].innerText : found[j].textContent;
+        if (text && text.indexOf(content) !== -1) return found[j];
+    }
+}
+return null;
+"""
+
+    # Returns [version, {header text: 1-based column index}] for the table in
+    # arguments[0], or null if its version still equals arguments[1]. The
+    # version is increased by a MutationObserver whenever the table changes.
+    _header_index_script = """
+var table = arguments[0], version = arguments[1];
+if (version !== null && table.s2lHeaderVersion === version) return null;
+if (table.s2lHeaderVersion === undefined && window.MutationObserver) {
+    table.s2lHeaderVersion = 0;
+    new MutationObserver(function () { table.s2lHeaderVersion++; }).observe(
+        table, {childList: true, subtree: true, characterData: true});
+}
+var row = null;
+for (var i = 0; i < table.rows.length && row === null; i++) {
+    if (table.rows[i].getElementsByTagName('th').length > 0) row = table.rows[i];
+}
+if (row === null) row = table.rows[0];
+var columns = {};
+for (var j = 0; row && j < row.cells.length; j++) {
+    var text = row.cells[j].innerText !== undefined ? row.cells[j].innerText : row.cells[j].textContent;
+    text = (text || '').replace(/^\\s+|\\s+$/g, '');
+    if (!(text in columns)) columns[text] = j + 1;
+}
+return [table.s2lHeaderVersion === undefined ? null : table.s2lHeaderVersion, columns];
+"""
+
     def __init__(self, element_finder=None):
         if not element_finder:
             element_finder = ElementFinder()
@@ -72,6 +135,11 @@ class TableElementFinder(object):
     def find_by_col(self, browser, table_locator, col, content):
         location_method = "col"
         col = str(col)
+        if not self._is_index(col):
+            col = self.get_column_index(browser, table_locator, col)
+            if col is None:
+                return None
+            col = str(col)
         if col[0] == "-":
             col = col[1:]
             location_method = "last-col"
@@ -79,6 +147,82 @@ class TableElementFinder(object):
         locators = [locator % str(col) for locator in locators]
         return self._search_in_locators(browser, locators, content)
 
+    def get_column_index(self, browser, table_locator, header):
+        # Header indexes are kept until the page or the table changes
+        cache = browser.get_page_cache().setdefault('table_headers', {})
+        (table, version, columns) = cache.get(table_locator, (None, None, None))
+        result = None
+        if table is not None:
+            try:
+                result = browser.execute_script(self._header_index_script, table, version)
+            except StaleElementReferenceException:
+                table = None
+        if table is None:
+            table = self.find(browser, table_locator)
+            if table is None:
+                return None
+            result = browser.execute_script(self._header_index_script, table, None)
+        if result is not None:
+            (version, columns) = result
+            cache[table_locator] = (table, version, columns)
+        return columns.get(header)
+
+    def get_cell_by_header(self, browser, table_locator, row_index, header):
+        column = self.get_column_index(browser, table_locator, header)
+        if column is None:
+            return None
+        end = row_index + 1 if row_index != -1 else None
+        rows = self.get_rows(browser, table_locator, row_index, end)
+        if not rows or column > len(rows[0]['cells']):
+            return None
+        return rows[0]['cells'][column - 1]
+
+    def get_snapshot(self, browser, table_locator):
+        return self.get_rows(browser, table_locator)
+
+    def get_rows(self, browser, table_locator, start=0, end=None):
+        table = self.find(browser, table_locator)
+        if table is None:
+            return None
+        return self._get_rows(browser, table, start, end)
+
+    def iter_rows(self, browser, table_locator, chunk_size=500):
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be a positive integer, got %d." % chunk_size)
+        table = self.find(browser, table_locator)
+        if table is None:
+            return None
+        return self._iter_rows(browser, table, chunk_size)
+
+    def get_cell(self, browser, table_locator, row_index, column_index):
+        end = row_index + 1 if row_index != -1 else None
+        rows = self.get_rows(browser, table_locator, row_index, end)
+        if not rows:
+            return None
+        # Header cells are counted before data cells of the same row
+        cells = [text for text, tag in zip(rows[0]['cells'], rows[0]['tags']) if tag == 'th']
+        cells.extend(text for text, tag in zip(rows[0]['cells'], rows[0]['tags']) if tag != 'th')
+        if -len(cells) <= column_index < len(cells):
+            return cells[column_index]
+        return None
+
+    def _iter_rows(self, browser, table, chunk_size):
+        # Rows are read chunk_size rows at a time to keep the payloads small
+        start = 0
+        while True:
+            rows = self._get_rows(browser, table, start, start + chunk_size)
+            for row in rows:
+                yield row
+            if len(rows) < chunk_size:
+                return
+            start += chunk_size
+
+    def _get_rows(self, browser, table, start, end):
+        rows = browser.execute_script(self._rows_script, table, start, end) or []
+        return [{'section': section, 'cells': cells, 'tags': tags}
+                for section, cells, tags in rows]
+
     def _parse_table_locator(self, table_locator, location_method):
         if table_locator.startswith('xpath='):
             table_locator_type = 'xpath'
@@ -96,6 +240,13 @@ class TableElementFinder(object):
             locator_suffixes)
 
     def _search_in_locators(self, browser, locators, content):
+        if content is not None:
+            queries = self._get_browser_queries(browser, locators)
+            if queries is not None:
+                try:
+                    return browser.execute_script(self._search_script, queries, content)
+                except WebDriverException as err:
+                    logger.debug("Searching table content in the browser failed: %s" % err)
         for locator in locators:
             elements = self._element_finder.find(browser, locator)
             for element in elements:
@@ -104,3 +255,19 @@ class TableElementFinder(object):
                 if element_text and content in element_text:
                     return element
         return None
+
+    def _is_index(self, col):
+        try:
+            int(col)
+        except ValueError:
+            return False
+        return True
+
+    def _get_browser_queries(self, browser, locators):
+        queries = []
+        for locator in locators:
+            query = self._element_finder.get_browser_query(browser, locator)
+            if query is None:
+                return None
+            queries.append(query)
+        return queries
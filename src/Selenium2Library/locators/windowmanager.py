@@ -1,3 +1,4 @@
+import time
 from types import *
 from robot import utils
 from selenium.webdriver.remote.webdriver import WebDriver
@@ -22,6 +23,25 @@ class WindowManager(object):
     def get_window_titles(self, browser):
         return [ window_info[3] for window_info in self._get_window_infos(browser) ]
 
+    def wait_for_new_window(self, browser, timeout):
+        # Only the handle list is polled, no window is switched to before one appears
+        known_handles = set(browser.get_known_window_handles())
+        try:
+            known_handles.add(browser.get_current_window_handle())
+        except NoSuchWindowException:
+            pass
+        maxtime = time.time() + timeout
+        interval = 0.05
+        while True:
+            for handle in browser.get_window_handles():
+                if handle not in known_handles:
+                    browser.switch_to_window(handle)
+                    return handle
+            if time.time() > maxtime:
+                return None
+            time.sleep(interval)
+            interval = min(interval * 2, 0.5)
+
     def select(self, browser, locator):
         assert browser is not None
         if locator is not None:
@@ -64,20 +84,16 @@ class WindowManager(object):
             handles = browser.get_window_handles()
             browser.switch_to_window(handles[0])
             return
-        try:
-            starting_handle = browser.get_current_window_handle()
-        except NoSuchWindowException:
-            starting_handle = None
-        for handle in browser.get_window_handles():
-            browser.switch_to_window(handle)
-            if criteria == handle:
-                return
-            for item in browser.get_current_window_info()[2:4]:
+        def matcher(window_info):
+            if criteria == window_info[0]:
+                return True
+            for item in window_info[2:4]:
                 if item.strip().lower() == criteria.lower():
-                    return
-        if starting_handle:
-            browser.switch_to_window(starting_handle)
-        raise ValueError("Unable to locate window with handle or name or title or URL '" + criteria + "'")
+                    return True
+            return False
+        self._select_matching(
+            browser, matcher,
+            "Unable to locate window with handle or name or title or URL '" + criteria + "'")
     
     def _select_by_last_index(self, browser):
         handles = browser.get_window_handles()
@@ -112,30 +128,57 @@ class WindowManager(object):
                 criteria = ''
         return (prefix, criteria)
 
-    def _get_window_infos(self, browser):
-        window_infos = []
-        try:
-            starting_handle = browser.get_current_window_handle()
-        except NoSuchWindowException:
-            starting_handle = None
-        try:
-            for handle in browser.get_window_handles():
-                browser.switch_to_window(handle)
-                window_infos.append(browser.get_current_window_info())
-        finally:
-            if starting_handle:
-                browser.switch_to_window(starting_handle)
-        return window_infos
+    def _get_window_infos(self, browser, refresh=False):
+        # Only windows that are new or navigated since they were last read
+        # are switched to, others are taken from the browser's cache.
+        # Other windows may change without the cache noticing, so selecting
+        # a window checks the match and reads all windows again on a miss.
+        window_infos = browser.get_window_info_cache()
+        if refresh:
+            window_infos.clear()
+        handles = browser.get_window_handles()
+        for handle in list(window_infos):
+            if handle not in handles:
+                del window_infos[handle]
+        unknown_handles = [handle for handle in handles if handle not in window_infos]
+        if len(unknown_handles) > 0:
+            try:
+                starting_handle = browser.get_current_window_handle()
+            except NoSuchWindowException:
+                starting_handle = None
+            try:
+                for handle in unknown_handles:
+                    browser.switch_to_window(handle)
+                    window_infos[handle] = browser.get_current_window_info()
+            finally:
+                if starting_handle:
+                    browser.switch_to_window(starting_handle)
+        return [window_infos[handle] for handle in handles]
 
     def _select_matching(self, browser, matcher, error):
+        for window_info in self._get_window_infos(browser):
+            if matcher(window_info):
+                if self._select_if_still_matching(browser, window_info[0], matcher):
+                    return
+                break
+        # Windows may have changed without the cache noticing, read them all again
+        for window_info in self._get_window_infos(browser, True):
+            if matcher(window_info):
+                browser.switch_to_window(window_info[0])
+                return
+        raise ValueError(error)
+
+    def _select_if_still_matching(self, browser, handle, matcher):
+        # The cached information of a window other than the current one may be outdated
         try:
             starting_handle = browser.get_current_window_handle()
         except NoSuchWindowException:
             starting_handle = None
-        for handle in browser.get_window_handles():
-            browser.switch_to_window(handle)
-            if matcher(browser.get_current_window_info()):
-                return
+        browser.switch_to_window(handle)
+        window_info = browser.get_current_window_info()
+        browser.get_window_info_cache()[handle] = window_info
+        if matcher(window_info):
+            return True
         if starting_handle:
             browser.switch_to_window(starting_handle)
-        raise ValueError(error)
+        return False
@@ -1,4 +1,7 @@
 from browsercache import BrowserCache
+from lrucache import LRUCache
+from pollstrategy import PollStrategy
+from waitstatistics import WaitStatistics
 from librarylistener import LibraryListener
 import events
 
@@ -11,3 +14,9 @@ def escape_xpath_value(value):
     if '\'' in value:
         return "\"%s\"" % value
     return "'%s'" % value
+
+
+def is_truthy(item):
+    if isinstance(item, basestring):
+        return item.strip().upper() not in ('', 'FALSE', 'NO', 'OFF', '0', 'NONE')
+    return bool(item)
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+
+class LRUCache(object):
+
+    def __init__(self, maxsize=512):
+        self._items = OrderedDict()
+        self._maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        self._maxsize = int(maxsize)
+        self._trim()
+
+    def get(self, key, default=None):
+        try:
+            value = self._items.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self._items[key] = value
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._items.pop(key, None)
+        if self._maxsize > 0:
+            self._items[key] = value
+            self._trim()
+
+    def clear(self):
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_statistics(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._items), 'maxsize': self._maxsize}
+
+    def _trim(self):
+        while len(self._items) > max(self._maxsize, 0):
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
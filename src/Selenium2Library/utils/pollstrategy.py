@@ -0,0 +1,44 @@
+import random
+
+
+class PollStrategy(object):
+    """Decides how long waits sleep between two checks of their condition.
+
+    `fixed` sleeps `interval` seconds between every check. `exponential`
+    starts with `interval` and multiplies the sleep by `factor` after every
+    check, up to `max_interval`. `jitter` is like `exponential`, but sleeps a
+    random time between half and all of the exponential interval so that
+    parallel sessions do not poll in lockstep.
+    """
+
+    strategies = ('fixed', 'exponential', 'jitter')
+    defaults = {'fixed': (0.2, 0.2), 'exponential': (0.05, 1.0), 'jitter': (0.05, 1.0)}
+
+    def __init__(self, name='fixed', interval=None, max_interval=None, factor=2.0):
+        name = name.strip().lower()
+        if name not in self.strategies:
+            raise ValueError("Poll strategy '%s' is not supported. Available strategies are %s."
+                             % (name, ', '.join(self.strategies)))
+        default_interval, default_max_interval = self.defaults[name]
+        self.name = name
+        self.interval = float(interval) if interval is not None else default_interval
+        self.max_interval = (float(max_interval) if max_interval is not None
+                             else max(default_max_interval, self.interval))
+        self.factor = float(factor)
+        if self.interval <= 0 or self.max_interval < self.interval or self.factor < 1:
+            raise ValueError("Poll interval must be positive, not larger than the maximum "
+                             "interval, and the factor must be at least 1.")
+
+    def get_interval(self, poll):
+        """Returns the time to sleep after the `poll`th check, counting from 0."""
+        if self.name == 'fixed':
+            return self.interval
+        interval = min(self.interval * self.factor ** min(poll, 64), self.max_interval)
+        if self.name == 'jitter':
+            return random.uniform(interval / 2, interval)
+        return interval
+
+    def __str__(self):
+        if self.name == 'fixed':
+            return 'fixed (%g s)' % self.interval
+        return '%s (%g s - %g s, factor %g)' % (self.name, self.interval, self.max_interval, self.factor)
@@ -0,0 +1,105 @@
+import json
+import math
+import random
+import time
+
+
+class WaitStatistics(object):
+    """Collects how long waits take per keyword and target.
+
+    The target of a wait is the locator, text or condition it waits for.
+    Every wait is recorded with its wall time, the number of times its
+    condition was checked and its outcome, which is `passed`, `timed out` or
+    `failed`. A timeout is suggested for every target from the 99th
+    percentile of the wall times of the waits that passed.
+
+    Memory stays bounded however many waits are recorded: the percentiles
+    are computed from a random sample of at most `samples` wall times of
+    passed waits per target, which is exact until that many have passed.
+    """
+
+    # Upper bounds of the wall time histogram buckets, in seconds.
+    buckets = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+    outcomes = ('passed', 'timed out', 'failed')
+
+    def __init__(self, margin=1.5, minimum_timeout=1.0, samples=1000):
+        self.margin = margin
+        self.minimum_timeout = minimum_timeout
+        self.samples = samples
+        self._sites = {}
+        self._random = random.Random()
+
+    def record(self, keyword, target, elapsed, polls, outcome, timeout):
+        site = self._sites.get((keyword, target))
+        if site is None:
+            site = self._sites[(keyword, target)] = {
+                'calls': 0, 'total_time': 0.0, 'max_time': 0.0, 'passed_times': [],
+                'polls': 0, 'max_timeout': 0.0,
+                'outcomes': dict((name, 0) for name in self.outcomes),
+                'histogram': [0] * (len(self.buckets) + 1)}
+        site['calls'] += 1
+        site['total_time'] += elapsed
+        site['max_time'] = max(site['max_time'], elapsed)
+        site['polls'] += polls
+        site['max_timeout'] = max(site['max_timeout'], timeout)
+        site['outcomes'][outcome] += 1
+        site['histogram'][self._get_bucket(elapsed)] += 1
+        if outcome == 'passed':
+            self._sample(site['passed_times'], site['outcomes']['passed'], elapsed)
+
+    def get_sites(self):
+        return [self._summarize(keyword, target, self._sites[(keyword, target)])
+                for keyword, target in sorted(self._sites)]
+
+    def clear(self):
+        self._sites.clear()
+
+    def format_json(self):
+        return json.dumps({'generated': time.strftime('%Y-%m-%d %H:%M:%S'),
+                           'buckets': list(self.buckets),
+                           'waits': self.get_sites()},
+                          indent=2, sort_keys=True)
+
+    def _summarize(self, keyword, target, site):
+        passed = sorted(site['passed_times'])
+        p99 = self._percentile(passed, 99)
+        return {'keyword': keyword,
+                'target': target,
+                'calls': site['calls'],
+                'outcomes': dict(site['outcomes']),
+                'total_time': site['total_time'],
+                'mean_time': site['total_time'] / site['calls'],
+                'max_time': site['max_time'],
+                'p50_time': self._percentile(passed, 50),
+                'p99_time': p99,
+                'polls': site['polls'],
+                'max_timeout': site['max_timeout'],
+                'suggested_timeout': self._suggest_timeout(p99),
+                'histogram': list(site['histogram'])}
+
+    def _sample(self, samples, seen, elapsed):
+        # Reservoir sampling keeps every seen value with equal probability
+        if len(samples) < self.samples:
+            samples.append(elapsed)
+            return
+        index = self._random.randint(0, seen - 1)
+        if index < self.samples:
+            samples[index] = elapsed
+
+    def _percentile(self, values, percent):
+        # Nearest-rank percentile of sorted values
+        if not values:
+            return None
+        rank = int(math.ceil(percent / 100.0 * len(values)))
+        return values[max(rank, 1) - 1]
+
+    def _suggest_timeout(self, p99):
+        if p99 is None:
+            return None
+        return max(math.ceil(p99 * self.margin * 10) / 10.0, self.minimum_timeout)
+
+    def _get_bucket(self, elapsed):
+        for index, bound in enumerate(self.buckets):
+            if elapsed <= bound:
+                return index
+        return len(self.buckets)
@@ -1,14 +1,51 @@
 import time
 from robot import utils
+from selenium.webdriver.remote.command import Command
 from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
 from locators import WindowManager
 
+# Commands after which the page in the browser may be a different one.
+NAVIGATION_COMMANDS = frozenset([
+    Command.GET, Command.GO_BACK, Command.GO_FORWARD, Command.REFRESH,
+    Command.CLICK_ELEMENT, Command.SUBMIT_ELEMENT, Command.SEND_KEYS_TO_ELEMENT,
+    Command.SEND_KEYS_TO_ACTIVE_ELEMENT, Command.CLICK, Command.DOUBLE_CLICK,
+    Command.MOUSE_UP, Command.SINGLE_TAP, Command.DOUBLE_TAP, Command.CLOSE,
+    Command.DELETE_SESSION, Command.QUIT
+])
+
+# Commands that change the window or frame subsequent commands apply to.
+CONTEXT_COMMANDS = frozenset([
+    Command.SWITCH_TO_WINDOW, Command.SWITCH_TO_FRAME, Command.SWITCH_TO_PARENT_FRAME
+])
+
+# Commands whose results tell which windows the browser has.
+WINDOW_HANDLE_COMMANDS = frozenset([
+    Command.GET_WINDOW_HANDLES, Command.GET_CURRENT_WINDOW_HANDLE
+])
+
+
+def _frame_key(frame_reference):
+    if isinstance(frame_reference, dict):
+        return tuple(sorted(frame_reference.items()))
+    return getattr(frame_reference, 'id', frame_reference)
+
+
 class WebDriverMonkeyPatches:
 
     RemoteWebDriver._base_execute = RemoteWebDriver.execute
+    RemoteWebDriver._base_implicitly_wait = RemoteWebDriver.implicitly_wait
+    RemoteWebDriver._base_set_script_timeout = RemoteWebDriver.set_script_timeout
 
     def execute(self, driver_command, params=None):
+        self._command_count = self.get_command_count() + 1
+        if driver_command in NAVIGATION_COMMANDS:
+            self.clear_page_cache()
+            self._invalidate_window_info()
         result = self._base_execute(driver_command, params)
+        if driver_command in CONTEXT_COMMANDS:
+            self._switch_page_context(driver_command, params or {})
+        if driver_command in WINDOW_HANDLE_COMMANDS and result:
+            self._remember_window_handles(result.get('value'))
         speed = self._get_speed()
         if speed > 0:
             time.sleep(speed)
@@ -38,6 +75,81 @@ class WebDriverMonkeyPatches:
     def current_window_is_main(self):
         return self.current_window_handle == self.window_handles[0];
 
+    def implicitly_wait(self, time_to_wait):
+        self._base_implicitly_wait(time_to_wait)
+        self._implicit_wait = float(time_to_wait)
+
+    def get_implicit_wait(self):
+        return getattr(self, '_implicit_wait', 0.0)
+
+    def set_script_timeout(self, time_to_wait):
+        self._base_set_script_timeout(time_to_wait)
+        self._script_timeout = float(time_to_wait)
+
+    def get_script_timeout(self):
+        # None when the timeout was never set through this driver, e.g. with Create Webdriver
+        return getattr(self, '_script_timeout', None)
+
+    def get_command_count(self):
+        return getattr(self, '_command_count', 0)
+
+    def get_page_cache(self):
+        page_caches = self._get_page_caches()
+        context = self._get_page_context()
+        if context not in page_caches:
+            page_caches[context] = {}
+        return page_caches[context]
+
+    def clear_page_cache(self):
+        self._get_page_caches().clear()
+
+    def get_known_window_handles(self):
+        if not hasattr(self, '_known_window_handles'):
+            self._known_window_handles = set()
+        return self._known_window_handles
+
+    def _remember_window_handles(self, handles):
+        if isinstance(handles, list):
+            self.get_known_window_handles().update(handles)
+        elif handles:
+            self.get_known_window_handles().add(handles)
+
+    def get_window_info_cache(self):
+        if not hasattr(self, '_window_infos'):
+            self._window_infos = {}
+        return self._window_infos
+
+    def _invalidate_window_info(self):
+        window_infos = self.get_window_info_cache()
+        window = self._get_page_context()[0]
+        if window in window_infos:
+            del window_infos[window]
+        else:
+            # The current window is not known by its handle
+            window_infos.clear()
+
+    def _get_page_caches(self):
+        if not hasattr(self, '_page_caches'):
+            self._page_caches = {}
+        return self._page_caches
+
+    def _get_page_context(self):
+        if not hasattr(self, '_page_context'):
+            self._page_context = (None, ())
+        return self._page_context
+
+    def _switch_page_context(self, driver_command, params):
+        window, frames = self._get_page_context()
+        if driver_command == Command.SWITCH_TO_WINDOW:
+            window, frames = params.get('name', params.get('handle')), ()
+        elif driver_command == Command.SWITCH_TO_PARENT_FRAME:
+            frames = frames[:-1]
+        elif params.get('id') is None:
+            frames = ()
+        else:
+            frames = frames + (_frame_key(params['id']),)
+        self._page_context = (window, frames)
+
     def set_speed(self, seconds):
         self._speed = seconds
 
@@ -52,6 +164,20 @@ class WebDriverMonkeyPatches:
     RemoteWebDriver.get_current_window_handle = get_current_window_handle
     RemoteWebDriver.get_current_window_info = get_current_window_info
     RemoteWebDriver.get_window_handles = get_window_handles
+    RemoteWebDriver.implicitly_wait = implicitly_wait
+    RemoteWebDriver.get_implicit_wait = get_implicit_wait
+    RemoteWebDriver.set_script_timeout = set_script_timeout
+    RemoteWebDriver.get_script_timeout = get_script_timeout
+    RemoteWebDriver.get_command_count = get_command_count
+    RemoteWebDriver.get_page_cache = get_page_cache
+    RemoteWebDriver.clear_page_cache = clear_page_cache
+    RemoteWebDriver.get_known_window_handles = get_known_window_handles
+    RemoteWebDriver._remember_window_handles = _remember_window_handles
+    RemoteWebDriver.get_window_info_cache = get_window_info_cache
+    RemoteWebDriver._invalidate_window_info = _invalidate_window_info
+    RemoteWebDriver._get_page_caches = _get_page_caches
+    RemoteWebDriver._get_page_context = _get_page_context
+    RemoteWebDriver._switch_page_context = _switch_page_context
     RemoteWebDriver.set_speed = set_speed
     RemoteWebDriver._get_speed = _get_speed
     RemoteWebDriver.execute = execute
@@ -0,0 +1,2 @@
+def find_by_id(browser, criteria, tag, constraints):
+    return browser.find_elements_by_id(criteria)
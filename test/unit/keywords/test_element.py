@@ -0,0 +1,52 @@
+import unittest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from Selenium2Library.keywords._element import _ElementKeywords
+from mockito import *
+
+
+class ElementKeywordsWithBrowser(_ElementKeywords):
+
+    def __init__(self, browser):
+        _ElementKeywords.__init__(self)
+        self.browser = browser
+
+    def _current_browser(self):
+        return self.browser
+
+    def _info(self, message):
+        pass
+
+
+class ElementKeywordsTests(unittest.TestCase):
+
+    def test_absence_check_disables_implicit_wait(self):
+        browser = mock()
+        when(browser).get_implicit_wait().thenReturn(10.0)
+        when(browser).find_element(By.ID, 'missing').thenRaise(NoSuchElementException())
+        ElementKeywordsWithBrowser(browser).page_should_not_contain_element('id=missing')
+        verify(browser).implicitly_wait(0)
+        verify(browser).implicitly_wait(10.0)
+
+    def test_implicit_wait_is_restored_when_lookup_fails(self):
+        browser = mock()
+        when(browser).get_implicit_wait().thenReturn(10.0)
+        when(browser).find_element(By.ID, 'broken').thenRaise(RuntimeError('failed'))
+        keywords = ElementKeywordsWithBrowser(browser)
+        self.assertRaises(RuntimeError, keywords.page_should_not_contain_element, 'id=broken')
+        verify(browser).implicitly_wait(10.0)
+
+    def test_implicit_wait_is_not_changed_when_zero(self):
+        browser = mock()
+        when(browser).get_implicit_wait().thenReturn(0.0)
+        when(browser).find_element(By.ID, 'missing').thenRaise(NoSuchElementException())
+        ElementKeywordsWithBrowser(browser).page_should_not_contain_element('id=missing')
+        verify(browser, times=0).implicitly_wait(any())
+
+    def test_memoize_is_parsed_as_boolean(self):
+        keywords = ElementKeywordsWithBrowser(mock())
+        keywords.add_location_strategy('off', 'Find', persist=True, memoize='False')
+        keywords.add_python_location_strategy('on', lambda *args: [], persist=True, memoize='yes')
+        strategies = keywords._element_finder._strategies
+        self.assertFalse(strategies['off'].__self__.memoize)
+        self.assertTrue(strategies['on'].__self__.memoize)
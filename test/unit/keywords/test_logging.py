@@ -0,0 +1,42 @@
+import codecs
+import os
+import shutil
+import tempfile
+import unittest
+from Selenium2Library.keywords._logging import _LoggingKeywords
+
+
+class LoggingKeywords(_LoggingKeywords):
+
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self.messages = []
+
+    def _get_log_dir(self):
+        return self.log_dir
+
+    def _info(self, message):
+        self.messages.append(message)
+
+
+class LoggingKeywordsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def test_output_path_is_relative_to_log_dir(self):
+        keywords = LoggingKeywords(self.log_dir)
+        path = keywords._get_output_path('reports/run/table.csv')
+        self.assertEqual(path, os.path.join(self.log_dir, 'reports', 'run', 'table.csv'))
+        self.assertTrue(os.path.isdir(os.path.dirname(path)))
+
+    def test_report_is_written_as_utf8(self):
+        keywords = LoggingKeywords(self.log_dir)
+        keywords._write_report('reports/waits.json', 'Wait statistics', lambda text: text, u'\xe4\u20ac')
+        path = os.path.join(self.log_dir, 'reports', 'waits.json')
+        with codecs.open(path, encoding='UTF-8') as report:
+            self.assertEqual(report.read(), u'\xe4\u20ac')
+        self.assertEqual(keywords.messages, ["Wait statistics report written to '%s'." % path])
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from Selenium2Library.keywords._tableelement import _TableElementKeywords
+from mockito import *
+
+
+class TableElementKeywordsWithBrowser(_TableElementKeywords):
+
+    def __init__(self, browser):
+        _TableElementKeywords.__init__(self)
+        self.browser = browser
+
+    def _current_browser(self):
+        return self.browser
+
+    def _info(self, message):
+        pass
+
+    def log_source(self, loglevel='INFO'):
+        pass
+
+
+class TableShouldMatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.keywords = TableElementKeywordsWithBrowser(mock())
+        self.finder = mock()
+        self.keywords._table_element_finder = self.finder
+        when(self.finder).get_snapshot(any(), 'orders').thenReturn([
+            {'section': 'thead', 'cells': [u'Id', u'Price'], 'tags': ['th', 'th']},
+            {'section': 'tbody', 'cells': [u'1', u'9.99'], 'tags': ['td', 'td']},
+            {'section': 'tbody', 'cells': [u'2', u'20.00'], 'tags': ['td', 'td']}])
+
+    def test_matching_table(self):
+        self.keywords.table_should_match('orders', [['Id', 'Price'], ['1', '9.99'], ['2', '20.00']])
+
+    def test_section(self):
+        self.keywords.table_should_match('orders', [['1', '9.99'], ['2', '20.00']], section='tbody')
+
+    def test_all_differences_are_reported(self):
+        try:
+            self.keywords.table_should_match('orders', [['Id', 'Cost'], ['1', '9.98']], section=None)
+        except AssertionError as err:
+            message = str(err)
+        else:
+            self.fail('AssertionError not raised')
+        self.assertTrue(message.startswith("Table identified by 'orders' did not match, 3 differences:"))
+        self.assertTrue("Row #1, column #2: expected 'Cost' but was 'Price'" in message)
+        self.assertTrue("Row #2, column #2: expected '9.98' but was '9.99'" in message)
+        self.assertTrue("Row #3: unexpected row" in message)
+
+    def test_numeric_tolerance(self):
+        self.keywords.table_should_match('orders', [['1', '10'], ['2', '20']],
+                                         tolerance='0.01', section='tbody')
+        self.assertRaises(AssertionError, self.keywords.table_should_match, 'orders',
+                          [['1', '10'], ['2', '20']], tolerance='0.001', section='tbody')
+
+    def test_missing_cells_and_rows(self):
+        try:
+            self.keywords.table_should_match('orders', [['1', '9.99', 'x'], ['2', '20.00'], ['3']],
+                                             section='tbody')
+        except AssertionError as err:
+            message = str(err)
+        else:
+            self.fail('AssertionError not raised')
+        self.assertTrue("Row #1, column #3: missing cell 'x'" in message)
+        self.assertTrue("Row #3: missing row" in message)
+
+    def test_expected_data_from_file(self):
+        for extension, delimiter in (('.csv', ','), ('.tsv', '\t')):
+            handle, path = tempfile.mkstemp(suffix=extension)
+            os.write(handle, '1%s9.99\n2%s20.00\n' % (delimiter, delimiter))
+            os.close(handle)
+            try:
+                self.keywords.table_should_match('orders', path, section='tbody')
+            finally:
+                os.remove(path)
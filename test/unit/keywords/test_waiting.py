@@ -0,0 +1,351 @@
+import unittest
+from mockito import *
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from Selenium2Library.keywords._element import _ElementKeywords
+from Selenium2Library.keywords._waiting import _WaitingKeywords
+
+
+class WaitingKeywords(_WaitingKeywords):
+
+    def __init__(self):
+        _WaitingKeywords.__init__(self)
+        self._timeout_in_secs = 5.0
+        self.messages = []
+
+    def _debug(self, message):
+        self.messages.append(message)
+
+    def _info(self, message):
+        self.messages.append(message)
+
+    def _warn(self, message):
+        self.messages.append(message)
+
+
+class WaitingKeywordsWithBrowser(WaitingKeywords, _ElementKeywords):
+
+    def __init__(self, browser):
+        WaitingKeywords.__init__(self)
+        _ElementKeywords.__init__(self)
+        self._browser = browser
+        self.set_wait_engine('browser')
+
+    def _current_browser(self):
+        return self._browser
+
+
+class StaleElement(object):
+
+    @property
+    def text(self):
+        raise StaleElementReferenceException('stale')
+
+
+class WaitingKeywordsTests(unittest.TestCase):
+
+    def test_wait_logs_polls(self):
+        keywords = WaitingKeywords()
+        keywords.set_wait_poll_strategy('exponential', '1 ms', '5 ms')
+        results = ['not yet', 'not yet', None]
+        keywords._wait_until_no_error(None, lambda: results.pop(0))
+        self.assertEqual(results, [])
+        self.assertTrue(keywords.messages[-1].startswith("Wait succeeded after 3 polls"))
+
+    def test_wait_times_out(self):
+        keywords = WaitingKeywords()
+        keywords.set_wait_poll_strategy('fixed', '1 ms')
+        self.assertRaises(AssertionError, keywords._wait_until_no_error, '10 ms', lambda: 'failed')
+        self.assertTrue(keywords.messages[-1].startswith("Wait timed out after"))
+
+    def test_set_wait_poll_strategy_returns_previous_strategy(self):
+        keywords = WaitingKeywords()
+        self.assertEqual(keywords.set_wait_poll_strategy('jitter'), 'fixed (0.2 s)')
+        self.assertEqual(keywords.set_wait_poll_strategy(), 'jitter (0.05 s - 1 s, factor 2)')
+
+    def test_set_wait_engine_returns_previous_engine(self):
+        keywords = WaitingKeywords()
+        self.assertEqual(keywords.set_wait_engine('Browser'), 'python')
+        self.assertEqual(keywords.set_wait_engine(), 'browser')
+        self.assertRaises(ValueError, keywords.set_wait_engine, 'javascript')
+
+    def test_browser_engine_waits_in_one_script(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenReturn([True, [[True, True, None]]])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.wait_until_page_contains_element('id=foo', '2 s')
+        verify(browser).execute_async_script(
+            keywords._browser_wait_script,
+            [{'type': 'element', 'query': {'queries': [['id', 'foo']], 'tag': None, 'constraints': {}},
+              'text': None, 'negate': False}],
+            'all', 2000)
+        verify(browser, times=0).set_script_timeout(any())
+        verify(browser, times=0).find_element(any(), any())
+
+    def test_browser_engine_splits_waits_longer_than_script_timeout(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenReturn(
+            [False, [[False, False, None]]]).thenReturn([True, [[True, True, None]]])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.wait_until_page_contains('text', '10 s')
+        verify(browser, times=2).execute_async_script(keywords._browser_wait_script, any(), 'all', 4500)
+        verify(browser, times=0).set_script_timeout(any())
+
+    def test_browser_engine_sets_unknown_script_timeout_once(self):
+        browser = self._make_browser(script_timeout=None)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenReturn([True, [[True, True, None]]])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.wait_until_page_contains('text', '2 s')
+        verify(browser, times=1).set_script_timeout(any())
+        verify(browser).set_script_timeout(5.0)
+        verify(browser).execute_async_script(keywords._browser_wait_script, any(), 'all', 2000)
+
+    def test_python_fallback_uses_time_left_of_browser_wait(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenRaise(
+            WebDriverException('document unloaded while waiting for result'))
+        keywords = WaitingKeywordsWithBrowser(browser)
+        timeouts = []
+        keywords._wait_until_no_error = lambda timeout, wait_func: timeouts.append(timeout)
+        keywords.wait_until_page_contains('text', '2 s')
+        self.assertTrue(isinstance(timeouts[0], float) and 1.5 < timeouts[0] < 2.0)
+
+    def test_browser_engine_reports_error_of_final_check(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenReturn([False, [[False, False, None]]])
+        when(browser).find_element(By.ID, 'foo').thenRaise(NoSuchElementException())
+        keywords = WaitingKeywordsWithBrowser(browser)
+        try:
+            keywords.wait_until_element_is_visible('id=foo', '1 s')
+            self.fail('AssertionError not raised')
+        except AssertionError as err:
+            self.assertEqual(str(err), "Element locator 'id=foo' did not match any elements after 1 second")
+        verify(browser, times=1).execute_async_script(any(), any(), any(), any())
+
+    def test_browser_engine_handles_script_timeout(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenRaise(TimeoutException('timeout'))
+        when(browser).execute_script(any()).thenReturn(False)
+        keywords = WaitingKeywordsWithBrowser(browser)
+        self.assertRaises(AssertionError, keywords.wait_until_page_contains_element, 'css=div', '1 s')
+        verify(browser, times=1).execute_async_script(any(), any(), any(), any())
+
+    def test_browser_engine_falls_back_to_polling(self):
+        browser = self._make_browser(script_timeout=5.0)
+        element = mock()
+        when(element).is_displayed().thenReturn(True)
+        when(browser).find_element(By.ID, 'foo').thenReturn(element)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenRaise(WebDriverException('not supported'))
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.wait_until_element_is_visible('id=foo', '1 s')
+        verify(element).is_displayed()
+
+    def test_browser_engine_is_not_used_for_locators_resolved_in_python(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_script(any()).thenReturn([mock()])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.wait_until_page_contains_element('dom=document.images', '1 s')
+        verify(browser, times=0).execute_async_script(any(), any(), any(), any())
+
+    def test_absence_wait_disables_implicit_wait_once(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).get_implicit_wait().thenReturn(10.0)
+        when(browser).find_element(By.ID, 'gone').thenReturn(mock()).thenReturn(mock()).thenRaise(
+            NoSuchElementException())
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.set_wait_engine('python')
+        keywords.set_wait_poll_strategy('fixed', '1 ms')
+        keywords.wait_until_page_does_not_contain_element('id=gone', '1 s')
+        verify(browser, times=3).find_element(By.ID, 'gone')
+        verify(browser, times=1).implicitly_wait(0)
+        verify(browser, times=1).implicitly_wait(10.0)
+
+    def _make_browser(self, script_timeout):
+        browser = mock()
+        when(browser).get_script_timeout().thenReturn(script_timeout)
+        when(browser).get_page_cache().thenReturn({})
+        when(browser).get_implicit_wait().thenReturn(0.0)
+        when(browser).get_command_count().thenReturn(0)
+        return browser
+
+    def test_wait_until_any_returns_first_true_condition(self):
+        browser = self._make_browser(script_timeout=5.0)
+        visible, hidden = mock(), mock()
+        when(visible).is_displayed().thenReturn(True)
+        when(hidden).is_displayed().thenReturn(False)
+        when(browser).find_element(By.ID, 'grid').thenReturn(hidden)
+        when(browser).find_element(By.ID, 'empty').thenReturn(visible)
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.set_wait_engine('python')
+        self.assertEqual(keywords.wait_until_any('element is visible', 'id=grid',
+                                                 'Element  Is Visible', 'id=empty', 'timeout=1 s'), 2)
+        self.assertEqual(keywords.messages[-1], "Condition 2, element is visible 'id=empty', became true.")
+
+    def test_wait_until_all_lists_false_conditions(self):
+        browser = self._make_browser(script_timeout=5.0)
+        element = mock()
+        element.text = 'Saved'
+        when(browser).find_element(By.ID, 'status').thenReturn(element)
+        when(browser).find_element(By.ID, 'spinner').thenRaise(NoSuchElementException())
+        when(browser).find_element(By.ID, 'save').thenRaise(NoSuchElementException())
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.set_wait_engine('python')
+        try:
+            keywords.wait_until_all('element is not visible', 'id=spinner', 'element is enabled', 'id=save',
+                                    'element contains', 'id=status', 'Saved', 'timeout=10 ms')
+            self.fail('AssertionError not raised')
+        except AssertionError as err:
+            self.assertEqual(str(err), "Conditions did not become true in 10 milliseconds: "
+                                       "element is enabled 'id=save'.")
+
+    def test_wait_until_any_in_browser(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenReturn(
+            [True, [[False, False, None], [True, True, 'Failed']]])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        self.assertEqual(keywords.wait_until_any('page contains element', 'id=grid', 'element contains',
+                                                 'id=toast', 'Failed', 'timeout=2 s'), 2)
+        verify(browser).execute_async_script(keywords._browser_wait_script, any(), 'any', 2000)
+
+    def test_wait_until_any_in_browser_uses_given_error(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_async_script(any(), any(), any(), any()).thenReturn(
+            [False, [[False, False, None]]])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        try:
+            keywords.wait_until_any('page contains', 'Done', 'error=Not done', 'timeout=1 s')
+            self.fail('AssertionError not raised')
+        except AssertionError as err:
+            self.assertEqual(str(err), 'Not done')
+
+    def test_invalid_wait_conditions(self):
+        keywords = WaitingKeywords()
+        self.assertRaises(ValueError, keywords._parse_conditions, ['page is ready'])
+        self.assertRaises(ValueError, keywords._parse_conditions, ['element contains', 'id=foo'])
+        self.assertRaises(ValueError, keywords._parse_conditions, ['timeout=1 s'])
+
+    def test_wait_for_page_idle(self):
+        browser = self._make_browser(script_timeout=10.0)
+        when(browser).execute_async_script(any(), any(), any()).thenReturn([True, []])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.wait_for_page_idle('5 s', '200 ms')
+        verify(browser).execute_async_script(keywords._page_idle_script, 200, 5000)
+        verify(browser, times=0).set_script_timeout(any())
+
+    def test_wait_for_page_idle_reports_what_kept_page_busy(self):
+        browser = self._make_browser(script_timeout=5.0)
+        when(browser).execute_async_script(any(), any(), any()).thenReturn(
+            [False, ['1 pending request(s)', '2 pending timer(s)']])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        try:
+            keywords.wait_for_page_idle('1 s')
+            self.fail('AssertionError not raised')
+        except AssertionError as err:
+            self.assertEqual(str(err), "Page did not become idle in 1 second: "
+                                       "1 pending request(s), 2 pending timer(s).")
+
+    def test_actions_wait_for_page_idle_when_enabled(self):
+        browser = self._make_browser(script_timeout=10.0)
+        when(browser).execute_async_script(any(), any(), any()).thenReturn([False, ['1 running transition(s)']])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords._wait_for_page_idle_before_action()
+        verify(browser, times=0).execute_async_script(any(), any(), any())
+        self.assertFalse(keywords.set_page_idle_wait(True, '100 ms'))
+        keywords._wait_for_page_idle_before_action()
+        verify(browser).execute_async_script(keywords._page_idle_script, 100, 5000)
+        self.assertEqual(keywords.messages[-1], "Page did not become idle in 5 seconds "
+                                                "before the action: 1 running transition(s).")
+        self.assertTrue(keywords.set_page_idle_wait('no'))
+
+    def test_wait_for_page_idle_is_retried_on_new_document(self):
+        browser = self._make_browser(script_timeout=10.0)
+        when(browser).execute_async_script(any(), any(), any()).thenRaise(
+            WebDriverException('document unloaded while waiting for result')).thenReturn([True, []])
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.wait_for_page_idle('5 s')
+        verify(browser, times=2).execute_async_script(any(), any(), any())
+
+    def test_wait_for_page_idle_fails_when_page_keeps_changing(self):
+        browser = self._make_browser(script_timeout=10.0)
+        when(browser).execute_async_script(any(), any(), any()).thenRaise(
+            WebDriverException('document unloaded while waiting for result'))
+        keywords = WaitingKeywordsWithBrowser(browser)
+        try:
+            keywords.wait_for_page_idle('5 s')
+            self.fail('AssertionError not raised')
+        except AssertionError as err:
+            self.assertEqual(str(err), "Page did not become idle in 5 seconds: page changed while waiting.")
+        verify(browser, times=2).execute_async_script(any(), any(), any())
+
+    def test_actions_are_done_when_waiting_for_page_idle_fails(self):
+        def no_browser():
+            raise RuntimeError('No browser is open')
+        keywords = WaitingKeywords()
+        keywords._current_browser = no_browser
+        keywords.set_page_idle_wait(True, '100 ms')
+        keywords._wait_for_page_idle_before_action()
+        self.assertEqual(keywords.messages[-1], "Page did not become idle in 5 seconds before the "
+                                                "action: waiting failed: No browser is open.")
+
+    def test_wait_until_element_contains_finds_stale_element_again(self):
+        browser = self._make_browser(script_timeout=5.0)
+        stale, fresh = StaleElement(), mock()
+        fresh.text = 'New Content'
+        when(browser).find_element(By.ID, 'content').thenReturn(stale).thenReturn(fresh)
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.set_wait_engine('python')
+        keywords.wait_until_element_contains('id=content', 'New', '1 s')
+        self.assertTrue("Element 'id=content' became stale, finding it again." in keywords.messages)
+
+    def test_wait_until_element_does_not_contain_waits_for_replaced_element(self):
+        browser = self._make_browser(script_timeout=5.0)
+        old, new = StaleElement(), mock()
+        new.text = 'Done'
+        keywords = WaitingKeywordsWithBrowser(browser)
+        keywords.set_wait_engine('python')
+        keywords.set_wait_poll_strategy('fixed', '1 ms')
+        checks = [old, None, new]
+        keywords._element_find = lambda locator, first_only, required, tag=None: checks.pop(0)
+        keywords.wait_until_element_does_not_contain('id=status', 'Loading', '1 s')
+        self.assertEqual(checks, [])
+
+    def test_stale_element_is_retried(self):
+        keywords = WaitingKeywords()
+        keywords.set_wait_poll_strategy('fixed', '1 ms')
+        results = [StaleElementReferenceException('stale'), None]
+        def check():
+            result = results.pop(0)
+            if result is not None:
+                raise result
+        keywords._wait_until_no_error('1 s', check)
+        self.assertEqual(results, [])
+
+    def test_wait_times_out_with_stale_element(self):
+        keywords = WaitingKeywords()
+        keywords.set_wait_poll_strategy('fixed', '1 ms')
+        def check():
+            raise StaleElementReferenceException('element is not attached')
+        try:
+            keywords._wait_until_no_error('10 ms', check)
+            self.fail('AssertionError not raised')
+        except AssertionError as err:
+            self.assertEqual(str(err), 'Element became stale during the wait: element is not attached')
+
+    def test_waits_are_recorded(self):
+        keywords = WaitingKeywordsWithBrowser(self._make_browser(script_timeout=5.0))
+        keywords.set_wait_engine('python')
+        keywords.set_wait_poll_strategy('fixed', '1 ms')
+        keywords._is_visible = lambda locator: True
+        keywords.wait_until_element_is_visible('id=grid', '1 s')
+        keywords._is_visible = lambda locator: False
+        self.assertRaises(AssertionError, keywords.wait_until_element_is_visible, 'id=grid', '10 ms')
+        (site,) = keywords.get_wait_statistics()
+        self.assertEqual((site['keyword'], site['target']), ('Wait Until Element Is Visible', 'id=grid'))
+        self.assertEqual(site['outcomes'], {'passed': 1, 'timed out': 1, 'failed': 0})
+        self.assertTrue(site['polls'] > 2)
+        self.assertEqual(site['max_timeout'], 1.0)
+        keywords.reset_wait_statistics()
+        self.assertEqual(keywords.get_wait_statistics(), [])
@@ -0,0 +1,82 @@
+import unittest
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.webelement import WebElement
+from Selenium2Library.locators import CustomLocator
+from Selenium2Library.locators import ElementFinder
+from mockito import *
+
+
+class Element(WebElement):
+
+    def __init__(self, stale=False):
+        self.stale = stale
+
+    @property
+    def tag_name(self):
+        if self.stale:
+            raise StaleElementReferenceException()
+        return 'div'
+
+
+class CustomLocatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.browser = mock()
+        self.page_cache = {}
+        when(self.browser).get_page_cache().thenReturn(self.page_cache)
+
+    def finder(self, browser, criteria, tag, constraints):
+        self.calls.append(criteria)
+        return ['element for %s' % criteria]
+
+    def test_python_function_is_called_directly(self):
+        locator = CustomLocator('custom', self.finder)
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), ['element for x'])
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), ['element for x'])
+        self.assertEqual(self.calls, ['x', 'x'])
+
+    def test_single_result_is_returned_as_list(self):
+        locator = CustomLocator('custom', lambda *args: 'element')
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), ['element'])
+
+    def test_memoized_results_are_reused_on_same_page(self):
+        locator = CustomLocator('custom', self.finder, memoize=True)
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), ['element for x'])
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), ['element for x'])
+        self.assertEqual(locator.find(self.browser, 'x', 'a', {}), ['element for x'])
+        self.assertEqual(self.calls, ['x', 'x'])
+        self.page_cache.clear()
+        locator.find(self.browser, 'x', None, {})
+        self.assertEqual(self.calls, ['x', 'x', 'x'])
+
+    def test_empty_results_are_not_memoized(self):
+        found = [[], ['element']]
+        locator = CustomLocator('custom', lambda *args: found.pop(0), memoize=True)
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), [])
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), ['element'])
+        self.assertEqual(found, [])
+
+    def test_stale_memoized_element_is_found_again(self):
+        stale, fresh = Element(), Element()
+        found = [[stale], [fresh]]
+        locator = CustomLocator('custom', lambda *args: found.pop(0), memoize=True)
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), [stale])
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), [stale])
+        stale.stale = True
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), [fresh])
+        self.assertEqual(locator.find(self.browser, 'x', None, {}), [fresh])
+        self.assertEqual(found, [])
+
+    def test_clear_custom_locator_cache(self):
+        element_finder = ElementFinder()
+        first = CustomLocator('first', self.finder, memoize=True)
+        second = CustomLocator('second', self.finder, memoize=True)
+        first.find(self.browser, 'x', None, {})
+        second.find(self.browser, 'y', None, {})
+        element_finder.clear_custom_locator_cache(self.browser, 'first')
+        first.find(self.browser, 'x', None, {})
+        second.find(self.browser, 'y', None, {})
+        self.assertEqual(self.calls, ['x', 'y', 'x'])
+        element_finder.clear_custom_locator_cache(self.browser)
+        self.assertEqual(self.page_cache['custom_locators'], {})
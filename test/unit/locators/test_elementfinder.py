@@ -1,9 +1,20 @@
 import unittest
 import os
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from Selenium2Library.locators import CustomLocator
 from Selenium2Library.locators import ElementFinder
 from mockito import *
 from robot.utils.asserts import assert_raises_with_msg
 
+class StaleElement(object):
+
+    @property
+    def tag_name(self):
+        raise StaleElementReferenceException()
+
+
 class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_invalid_prefix(self):
@@ -45,7 +56,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_explicit_default_strategy_and_equals(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "default=page.do?foo=bar", tag='a')
         verify(browser).find_elements_by_xpath(
@@ -80,7 +91,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_a(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='a')
         verify(browser).find_elements_by_xpath(
@@ -88,7 +99,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_link_synonym(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='link')
         verify(browser).find_elements_by_xpath(
@@ -96,7 +107,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_img(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='img')
         verify(browser).find_elements_by_xpath(
@@ -104,7 +115,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_image_synonym(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='image')
         verify(browser).find_elements_by_xpath(
@@ -112,7 +123,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_input(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='input')
         verify(browser).find_elements_by_xpath(
@@ -120,7 +131,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_radio_button_synonym(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='radio button')
         verify(browser).find_elements_by_xpath(
@@ -128,7 +139,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_checkbox_synonym(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='checkbox')
         verify(browser).find_elements_by_xpath(
@@ -136,7 +147,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_file_upload_synonym(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='file upload')
         verify(browser).find_elements_by_xpath(
@@ -144,7 +155,7 @@ class ElementFinderTests(unittest.TestCase):
 
     def test_find_with_text_field_synonym(self):
         finder = ElementFinder()
-        browser = mock()
+        browser = self._make_mock_browser()
         when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
         finder.find(browser, "test1", tag='text field')
         verify(browser).find_elements_by_xpath(
@@ -187,18 +198,22 @@ class ElementFinderTests(unittest.TestCase):
         finder = ElementFinder()
         browser = mock()
 
-        id_elements = self._make_mock_elements('div', 'a')
-        name_elements = self._make_mock_elements('span', 'a')
-        when(browser).find_elements_by_id("test1").thenReturn(list(id_elements)).thenReturn(list(id_elements))
-        when(browser).find_elements_by_name("test1").thenReturn(list(name_elements)).thenReturn(list(name_elements))
-
-        all_elements = list(id_elements)
-        all_elements.extend(name_elements)
+        elements = self._make_mock_elements('div', 'a', 'span', 'a')
+        when(browser).find_elements_by_xpath("//*[@id='test1' or @name='test1']").thenReturn(elements)
 
         result = finder.find(browser, "identifier=test1")
-        self.assertEqual(result, all_elements)
+        self.assertEqual(result, elements)
         result = finder.find(browser, "identifier=test1", tag='a')
-        self.assertEqual(result, [id_elements[1], name_elements[1]])
+        self.assertEqual(result, [elements[1], elements[3]])
+
+    def test_find_by_identifier_uses_one_query(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        finder.find(browser, "identifier=test '1'")
+        verify(browser, times=1).find_elements_by_xpath("//*[@id=\"test '1'\" or @name=\"test '1'\"]")
+        verify(browser, times=0).find_elements_by_id(any())
+        verify(browser, times=0).find_elements_by_name(any())
 
     def test_find_by_id(self):
         finder = ElementFinder()
@@ -362,6 +377,333 @@ class ElementFinderTests(unittest.TestCase):
         result = finder.find(browser, "id=test1", tag='file upload')
         self.assertEqual(result, [elements[7]])
 
+    def test_find_with_filtering_in_browser(self):
+        finder = ElementFinder(filter_in_browser=True)
+        browser = mock()
+
+        elements = self._make_mock_elements('div', 'input', 'span', 'input')
+        when(browser).find_elements_by_id("test1").thenReturn(elements)
+        when(browser).execute_script(any(), elements, 'input', {'type': 'checkbox'}).thenReturn([elements[3]])
+
+        result = finder.find(browser, "id=test1", tag='checkbox')
+        self.assertEqual(result, [elements[3]])
+        verify(browser, times=1).execute_script(any(), elements, 'input', {'type': 'checkbox'})
+
+    def test_find_with_filtering_in_browser_skips_script_without_tag(self):
+        finder = ElementFinder(filter_in_browser=True)
+        browser = mock()
+
+        elements = self._make_mock_elements('div', 'a')
+        when(browser).find_elements_by_id("test1").thenReturn(elements)
+
+        result = finder.find(browser, "id=test1")
+        self.assertEqual(result, elements)
+        verify(browser, times=0).execute_script(any(), any(), any(), any())
+
+    def test_find_with_filtering_in_browser_and_no_candidates(self):
+        finder = ElementFinder(filter_in_browser=True)
+        browser = mock()
+        when(browser).find_elements_by_id("test1").thenReturn([])
+
+        result = finder.find(browser, "id=test1", tag='a')
+        self.assertEqual(result, [])
+        verify(browser, times=0).execute_script(any(), any(), any(), any())
+
+    def test_find_first_only_uses_single_element_command(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        element = self._make_mock_element('div')
+        when(browser).find_element(By.CSS_SELECTOR, "td").thenReturn(element)
+
+        result = finder.find(browser, "css=td", first_only=True)
+        self.assertEqual(result, [element])
+        verify(browser, times=0).find_elements_by_css_selector(any())
+
+    def test_find_first_only_when_nothing_matches(self):
+        finder = ElementFinder()
+        browser = mock()
+        when(browser).find_element(By.ID, "test1").thenRaise(NoSuchElementException())
+
+        result = finder.find(browser, "id=test1", first_only=True)
+        self.assertEqual(result, [])
+        verify(browser, times=0).find_elements_by_id(any())
+
+    def test_find_first_only_falls_back_when_tag_filter_rejects_first_match(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        elements = self._make_mock_elements('div', 'a', 'span', 'a')
+        when(browser).find_element(By.ID, "test1").thenReturn(elements[0])
+        when(browser).find_elements_by_id("test1").thenReturn(elements)
+
+        result = finder.find(browser, "id=test1", tag='a', first_only=True)
+        self.assertEqual(result, [elements[1], elements[3]])
+
+    def test_find_first_only_with_tag_filter_accepting_first_match(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        element = self._make_mock_element('a')
+        when(browser).find_element(By.XPATH, "//a").thenReturn(element)
+
+        result = finder.find(browser, "xpath=//a", tag='a', first_only=True)
+        self.assertEqual(result, [element])
+        verify(browser, times=0).find_elements_by_xpath(any())
+
+    def test_find_first_only_by_identifier(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        element = self._make_mock_element('input')
+        when(browser).find_element(By.XPATH, "//*[@id='test1' or @name='test1']").thenReturn(element)
+
+        result = finder.find(browser, "identifier=test1", first_only=True)
+        self.assertEqual(result, [element])
+
+    def test_find_first_only_with_default_strategy(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        element = self._make_mock_element('div')
+        when(browser).find_element(By.XPATH, "//div[(@id='test1' or @name='test1')]").thenReturn(element)
+
+        result = finder.find(browser, "test1", tag='div', first_only=True)
+        self.assertEqual(result, [element])
+        verify(browser, times=0).find_elements_by_xpath(any())
+
+    def test_find_first_only_with_strategy_without_single_element_command(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        elements = self._make_mock_elements('div', 'a')
+        when(browser).execute_script("return document.links;").thenReturn(elements)
+
+        result = finder.find(browser, "dom=document.links", first_only=True)
+        self.assertEqual(result, elements)
+
+    def test_find_reuses_compiled_locators(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        finder.find(browser, "test1", tag='div')
+        finder.find(browser, "test1", tag='div')
+        finder.find(browser, "test1", tag='span')
+        verify(browser, times=2).find_elements_by_xpath("//div[(@id='test1' or @name='test1')]")
+        statistics = finder.get_cache_statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['size']), (1, 2, 2))
+        self.assertEqual((statistics['xpath_hits'], statistics['xpath_misses']), (1, 2))
+
+    def test_base_url_is_fetched_once_per_page(self):
+        finder = ElementFinder()
+        browser = mock()
+        page_cache = {}
+        when(browser).get_page_cache().thenReturn(page_cache)
+        when(browser).get_current_url().thenReturn("http://localhost/mypage.html").thenReturn(
+            "http://otherhost/sub/page.html")
+
+        finder.find(browser, "test1", tag='img')
+        finder.find(browser, "test2", tag='a')
+        verify(browser, times=1).get_current_url()
+        verify(browser).find_elements_by_xpath(
+            "//img[(@id='test1' or @name='test1' or @src='test1' or @alt='test1' or @src='http://localhost/test1')]")
+
+        page_cache.clear()
+        finder.find(browser, "test1", tag='img')
+        verify(browser, times=2).get_current_url()
+        verify(browser).find_elements_by_xpath(
+            "//img[(@id='test1' or @name='test1' or @src='test1' or @alt='test1' or @src='http://otherhost/sub/test1')]")
+
+    def test_cache_size_can_be_changed(self):
+        finder = ElementFinder(cache_size=1)
+        browser = mock()
+
+        finder.find(browser, "id=test1")
+        finder.find(browser, "id=test2")
+        self.assertEqual(finder.get_cache_statistics()['size'], 1)
+        finder.set_cache_size(0)
+        self.assertEqual(finder.get_cache_size(), 0)
+        self.assertEqual(finder.get_cache_statistics()['size'], 0)
+
+    def test_find_first_only_reuses_cached_element(self):
+        finder = ElementFinder(cache_elements=True)
+        browser = self._make_mock_browser()
+
+        element = self._make_mock_element('div')
+        when(browser).find_element(By.ID, "test1").thenReturn(element)
+
+        self.assertEqual(finder.find(browser, "id=test1", 'div', first_only=True), [element])
+        self.assertEqual(finder.find(browser, "id=test1", 'div', first_only=True), [element])
+        verify(browser, times=1).find_element(By.ID, "test1")
+        self.assertEqual(finder.get_element_cache_statistics(),
+                         {'hits': 1, 'misses': 1, 'stale': 0})
+
+    def test_element_cache_is_not_used_for_single_command_lookups(self):
+        finder = ElementFinder(cache_elements=True)
+        browser = self._make_mock_browser()
+
+        element = self._make_mock_element('div')
+        when(browser).find_element(By.ID, "test1").thenReturn(element)
+
+        self.assertEqual(finder.find(browser, "id=test1", first_only=True), [element])
+        self.assertEqual(finder.find(browser, "id=test1", first_only=True), [element])
+        verify(browser, times=2).find_element(By.ID, "test1")
+        self.assertFalse('elements' in browser.get_page_cache())
+        self.assertEqual(finder.get_element_cache_statistics(),
+                         {'hits': 0, 'misses': 0, 'stale': 0})
+
+    def test_element_cache_is_not_used_for_default_strategy(self):
+        finder = ElementFinder(cache_elements=True)
+        browser = self._make_mock_browser()
+
+        element = self._make_mock_element('div')
+        when(browser).find_element(any(), any()).thenReturn(element)
+
+        self.assertEqual(finder.find(browser, "test1", 'div', first_only=True), [element])
+        self.assertEqual(finder.find(browser, "test1", 'div', first_only=True), [element])
+        verify(browser, times=2).find_element(any(), any())
+        self.assertFalse('elements' in browser.get_page_cache())
+
+    def test_element_cache_is_used_for_custom_strategies(self):
+        finder = ElementFinder(cache_elements=True)
+        browser = self._make_mock_browser()
+
+        element = self._make_mock_element('div')
+        calls = []
+        finder.register(CustomLocator('custom', lambda *args: calls.append(args) or [element]), True)
+
+        self.assertEqual(finder.find(browser, "custom=x", first_only=True), [element])
+        self.assertEqual(finder.find(browser, "custom=x", first_only=True), [element])
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_cached_element_is_found_again(self):
+        finder = ElementFinder(cache_elements=True)
+        browser = self._make_mock_browser()
+
+        stale = StaleElement()
+        fresh = self._make_mock_element('div')
+        browser.get_page_cache()['elements'] = {('id=test1', 'div'): stale}
+        when(browser).find_element(By.ID, "test1").thenReturn(fresh)
+
+        self.assertEqual(finder.find(browser, "id=test1", 'div', first_only=True), [fresh])
+        self.assertEqual(browser.get_page_cache()['elements'], {('id=test1', 'div'): fresh})
+        self.assertEqual(finder.get_element_cache_statistics()['stale'], 1)
+
+    def test_element_cache_is_keyed_by_tag(self):
+        finder = ElementFinder(cache_elements=True)
+        browser = self._make_mock_browser()
+
+        elements = self._make_mock_elements('div', 'a')
+        when(browser).find_element(By.ID, "test1").thenReturn(elements[0])
+        when(browser).find_elements_by_id("test1").thenReturn(elements)
+
+        self.assertEqual(finder.find(browser, "id=test1", 'div', first_only=True), [elements[0]])
+        self.assertEqual(finder.find(browser, "id=test1", 'a', first_only=True), [elements[1]])
+        self.assertEqual(sorted(browser.get_page_cache()['elements']), [('id=test1', 'a'), ('id=test1', 'div')])
+        finder.clear_element_cache(browser)
+        self.assertFalse('elements' in browser.get_page_cache())
+
+    def test_element_cache_is_not_used_for_all_matches(self):
+        finder = ElementFinder(cache_elements=True)
+        browser = self._make_mock_browser()
+
+        elements = self._make_mock_elements('div', 'a')
+        when(browser).find_elements_by_id("test1").thenReturn(elements)
+
+        self.assertEqual(finder.find(browser, "id=test1"), elements)
+        self.assertEqual(finder.find(browser, "id=test1"), elements)
+        verify(browser, times=2).find_elements_by_id("test1")
+
+    def test_find_many_resolves_locators_in_one_script(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        elements = self._make_mock_elements('div', 'a', 'input')
+        queries = [
+            {'queries': [['id', 'test1']], 'tag': None, 'constraints': {}},
+            {'queries': [['css', 'a.link']], 'tag': None, 'constraints': {}},
+            {'queries': [['xpath', "//*[(@id='test2' or @name='test2')]"]], 'tag': None, 'constraints': {}},
+            {'queries': [['xpath', '//input']], 'tag': None, 'constraints': {}}
+        ]
+        when(browser).execute_script(any(), queries).thenReturn(
+            [[elements[0]], [elements[1]], [], [elements[2]]])
+
+        result = finder.find_many(browser, ["id=test1", "css=a.link", "test2", "//input"])
+        self.assertEqual(result, {"id=test1": [elements[0]], "css=a.link": [elements[1]],
+                                  "test2": [], "//input": [elements[2]]})
+        verify(browser, times=1).execute_script(any(), any())
+
+    def test_find_many_with_tag(self):
+        finder = ElementFinder()
+        browser = self._make_mock_browser()
+        when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
+
+        queries = [
+            {'queries': [['xpath', "//*[@id='test1' or @name='test1']"]], 'tag': 'input', 'constraints': {'type': 'checkbox'}},
+            {'queries': [['xpath', "//input[@type='checkbox' and (@id='test2' or @name='test2' or @value='test2' or @src='test2' or @src='http://localhost/test2')]"]],
+             'tag': None, 'constraints': {'type': 'checkbox'}}
+        ]
+        when(browser).execute_script(any(), queries).thenReturn([[], []])
+
+        result = finder.find_many(browser, ["identifier=test1", "test2"], tag='checkbox')
+        self.assertEqual(result, {"identifier=test1": [], "test2": []})
+
+    def test_find_many_finds_other_strategies_one_by_one(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        elements = self._make_mock_elements('a', 'div')
+        when(browser).find_elements_by_link_text("my link").thenReturn([elements[0]])
+        when(browser).execute_script(any(), [{'queries': [['tag', 'div']], 'tag': None, 'constraints': {}}]).thenReturn(
+            [[elements[1]]])
+
+        result = finder.find_many(browser, ["link=my link", "tag=div"])
+        self.assertEqual(result, {"link=my link": [elements[0]], "tag=div": [elements[1]]})
+
+    def test_find_many_finds_one_by_one_when_script_returns_unexpected_result(self):
+        finder = ElementFinder()
+        browser = mock()
+
+        elements = self._make_mock_elements('div', 'a')
+        when(browser).execute_script(any(), any()).thenReturn([[elements[0]]])
+        when(browser).find_elements_by_id("test1").thenReturn([elements[0]])
+        when(browser).find_elements_by_css_selector("a.link").thenReturn([elements[1]])
+
+        result = finder.find_many(browser, ["id=test1", "css=a.link"])
+        self.assertEqual(result, {"id=test1": [elements[0]], "css=a.link": [elements[1]]})
+
+    def test_find_many_with_invalid_prefix(self):
+        finder = ElementFinder()
+        browser = mock()
+        assert_raises_with_msg(ValueError, "Element locator with prefix 'something' is not supported",
+                               finder.find_many, browser, ["id=test1", "something=test1"])
+
+    def test_find_by_sizzle_selector_remembers_engine_per_page(self):
+        finder = ElementFinder()
+        browser = self._make_mock_browser()
+
+        elements = self._make_mock_elements('div', 'a')
+        when(browser).execute_script(any(), "div.x", None, None, False).thenReturn(['jQuery', elements])
+        when(browser).execute_script(any(), "div.x", 'jQuery', None, False).thenReturn(['jQuery', elements])
+
+        self.assertEqual(finder.find(browser, "jquery=div.x"), elements)
+        self.assertEqual(browser.get_page_cache()['selector_engine'], 'jQuery')
+        self.assertEqual(finder.find(browser, "sizzle=div.x", tag='a'), [elements[1]])
+        verify(browser, times=1).execute_script(any(), "div.x", 'jQuery', None, False)
+
+    def test_find_by_sizzle_selector_injects_engine_when_missing(self):
+        finder = ElementFinder()
+        finder.selector_engine_source = "window.Sizzle = function () {};"
+        browser = self._make_mock_browser()
+
+        elements = self._make_mock_elements('div')
+        when(browser).execute_script(any(), "div", None, None, True).thenReturn(['missing', None])
+        when(browser).execute_script(any(), "div", None, "window.Sizzle = function () {};", False).thenReturn(
+            ['Sizzle', elements])
+
+        self.assertEqual(finder.find(browser, "sizzle=div"), elements)
+        self.assertEqual(browser.get_page_cache()['selector_engine'], 'Sizzle')
+
     def test_find_returns_bad_values(self):
         finder = ElementFinder()
         browser = mock()
@@ -379,6 +721,63 @@ class ElementFinderTests(unittest.TestCase):
                 result = finder.find(browser, locator, tag='div')
                 self.assertEqual(result, [])
 
+    def test_simple_xpath_is_rewritten_when_optimization_enabled(self):
+        finder = ElementFinder(optimize_locators=True)
+        browser = mock()
+        finder.find(browser, "xpath=//*[@id='test1']")
+        finder.find(browser, "//div[contains(@class,'row')]")
+        verify(browser).find_elements_by_id("test1")
+        verify(browser).find_elements_by_css_selector('div[class*="row"]')
+        verify(browser, times=0).find_elements_by_xpath(any())
+
+    def test_xpath_is_not_rewritten_when_optimization_disabled(self):
+        finder = ElementFinder()
+        browser = mock()
+        finder.find(browser, "xpath=//*[@id='test1']")
+        verify(browser).find_elements_by_xpath("//*[@id='test1']")
+
+    def test_default_locator_uses_css_when_optimization_enabled(self):
+        finder = ElementFinder(optimize_locators=True)
+        browser = self._make_mock_browser()
+        when(browser).get_current_url().thenReturn("http://localhost/mypage.html")
+        finder.find(browser, "test1")
+        finder.find(browser, "test2", tag='image')
+        verify(browser).find_elements_by_css_selector('[id="test1"],[name="test1"]')
+        verify(browser).find_elements_by_css_selector(
+            'img[id="test2"],img[name="test2"],img[src="test2"],img[alt="test2"],'
+            'img[src="http://localhost/test2"]')
+        verify(browser, times=0).find_elements_by_xpath(any())
+
+    def test_default_locator_falls_back_to_xpath_when_css_not_possible(self):
+        finder = ElementFinder(optimize_locators=True)
+        browser = mock()
+        finder.find(browser, "it's")
+        finder.find(browser, "test1", tag='button')
+        verify(browser).find_elements_by_xpath("//*[(@id=\"it's\" or @name=\"it's\")]")
+        verify(browser).find_elements_by_xpath(
+            "//button[(@id='test1' or @name='test1' or @value='test1' or "
+            "normalize-space(descendant-or-self::text())='test1')]")
+
+    def test_find_records_locator_statistics(self):
+        finder = ElementFinder()
+        browser = mock()
+        elements = self._make_mock_elements('div', 'div')
+        when(browser).get_command_count().thenReturn(3).thenReturn(4)
+        when(browser).find_elements_by_id("test1").thenReturn(elements)
+        finder.find(browser, "ID=test1")
+        strategies = finder.statistics.get_strategies()
+        self.assertEqual(list(strategies), ['id'])
+        self.assertEqual(strategies['id']['calls'], 1)
+        self.assertEqual(strategies['id']['round_trips'], 1)
+        self.assertEqual(strategies['id']['results'], 2)
+        self.assertEqual(finder.statistics.get_slowest()[0]['locator'], "ID=test1")
+
+    def _make_mock_browser(self):
+        browser = mock()
+        page_cache = {}
+        when(browser).get_page_cache().thenReturn(page_cache)
+        return browser
+
     def _make_mock_elements(self, *tags):
         elements = []
         for tag in tags:
@@ -0,0 +1,41 @@
+import unittest
+from Selenium2Library.locators import LocatorOptimizer
+
+
+class LocatorOptimizerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.optimizer = LocatorOptimizer()
+
+    def test_id_and_name_are_rewritten_to_native_strategies(self):
+        self.assertEqual(self.optimizer.optimize_xpath("//*[@id='foo']"), ('id', 'foo'))
+        self.assertEqual(self.optimizer.optimize_xpath('//*[@name="q"]'), ('name', 'q'))
+
+    def test_tag_only_is_rewritten_to_tag_strategy(self):
+        self.assertEqual(self.optimizer.optimize_xpath("//table"), ('tag', 'table'))
+
+    def test_attributes_are_rewritten_to_css(self):
+        self.assertEqual(self.optimizer.optimize_xpath("//input[@name='q' and @type='text']"),
+                         ('css', 'input[name="q"][type="text"]'))
+        self.assertEqual(self.optimizer.optimize_xpath("//input[@name='q'][@type='text']"),
+                         ('css', 'input[name="q"][type="text"]'))
+        self.assertEqual(self.optimizer.optimize_xpath("//*[@data-id='1']"),
+                         ('css', '[data-id="1"]'))
+
+    def test_functions_are_rewritten_to_css_operators(self):
+        self.assertEqual(self.optimizer.optimize_xpath("//div[contains(@class, 'x')]"),
+                         ('css', 'div[class*="x"]'))
+        self.assertEqual(self.optimizer.optimize_xpath("//a[starts-with(@href,'/docs')]"),
+                         ('css', 'a[href^="/docs"]'))
+
+    def test_complex_expressions_are_not_rewritten(self):
+        for xpath in ["//*", "//div/span", "//div[1]", "//*[@id='a' or @name='a']",
+                      "//a[text()='x']", "//*[@id=\"it's\"]", "(//div)[2]",
+                      "//div[contains(@class, '')]", "id('foo')"]:
+            self.assertEqual(self.optimizer.optimize_xpath(xpath), None, xpath)
+
+    def test_is_simple_value(self):
+        self.assertTrue(self.optimizer.is_simple_value('foo bar'))
+        self.assertFalse(self.optimizer.is_simple_value('it\'s'))
+        self.assertFalse(self.optimizer.is_simple_value('say "hi"'))
+        self.assertFalse(self.optimizer.is_simple_value('back\\slash'))
@@ -0,0 +1,46 @@
+import unittest
+from Selenium2Library.locators import LocatorStatistics
+
+
+class LocatorStatisticsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.statistics = LocatorStatistics(lambda locator: locator.split('=')[0])
+
+    def test_lookups_are_recorded_per_locator_and_strategy(self):
+        self.statistics.record('id=a', 0.02, 1, 1)
+        self.statistics.record('id=a', 0.04, 1, 1)
+        self.statistics.record('xpath=//b', 2.0, 3, 0)
+        strategies = self.statistics.get_strategies()
+        self.assertEqual(sorted(strategies), ['id', 'xpath'])
+        self.assertEqual(strategies['id']['calls'], 2)
+        self.assertAlmostEqual(strategies['id']['total_time'], 0.06)
+        self.assertAlmostEqual(strategies['id']['mean_time'], 0.03)
+        self.assertEqual(strategies['id']['max_time'], 0.04)
+        self.assertEqual(strategies['id']['round_trips'], 2)
+        self.assertEqual(strategies['id']['results'], 2)
+        self.assertEqual(strategies['id']['histogram'], [0, 2, 0, 0, 0, 0, 0])
+        self.assertEqual(strategies['xpath']['histogram'], [0, 0, 0, 0, 0, 1, 0])
+
+    def test_slowest_and_most_used_locators(self):
+        self.statistics.record('id=a', 0.01, 1, 1)
+        self.statistics.record('id=a', 0.01, 1, 1)
+        self.statistics.record('xpath=//b', 1.0, 1, 1)
+        self.statistics.record('css=c', 0.5, 1, 1)
+        slowest = self.statistics.get_slowest(2)
+        self.assertEqual([entry['locator'] for entry in slowest], ['xpath=//b', 'css=c'])
+        self.assertEqual(slowest[0]['strategy'], 'xpath')
+        most_used = self.statistics.get_most_used(1)
+        self.assertEqual([entry['locator'] for entry in most_used], ['id=a'])
+
+    def test_format_report(self):
+        self.statistics.record('id=a', 0.01, 1, 1)
+        report = self.statistics.format_report()
+        self.assertTrue('Slowest locators' in report)
+        self.assertTrue('id=a' in report)
+
+    def test_clear(self):
+        self.statistics.record('id=a', 0.01, 1, 1)
+        self.statistics.clear()
+        self.assertEqual(self.statistics.get_strategies(), {})
+        self.assertEqual(self.statistics.get_slowest(), [])
@@ -1,5 +1,7 @@
 import unittest
 from Selenium2Library.locators import TableElementFinder
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import WebDriverException
 from mockito import *
 
 class ElementFinderTests(unittest.TestCase):
@@ -42,8 +44,24 @@ class ElementFinderTests(unittest.TestCase):
         browser = mock()
         elements = self._make_mock_elements('td', 'td', 'td')
         elements[1].text = 'hi'
-        when(browser).find_elements_by_css_selector("table#test1").thenReturn(elements)
+        when(browser).execute_script(finder._search_script, any(), 'hi').thenReturn(elements[1])
         
+        self.assertEqual(
+            finder.find_by_content(browser, "test1", 'hi'),
+            elements[1])
+
+        self._verify_searched(browser, finder, 'hi', ['css', "table#test1"])
+        verify(browser, times=0).find_elements_by_css_selector(any())
+
+    def test_find_with_content_constraint_falls_back_to_reading_texts(self):
+        finder = TableElementFinder()
+        browser = mock()
+        elements = self._make_mock_elements('td', 'td', 'td')
+        elements[1].text = 'hi'
+        when(browser).execute_script(finder._search_script, any(), 'hi').thenRaise(
+            WebDriverException('no javascript'))
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn(elements)
+
         self.assertEqual(
             finder.find_by_content(browser, "test1", 'hi'),
             elements[1])
@@ -66,94 +84,225 @@ class ElementFinderTests(unittest.TestCase):
     def test_find_by_content_with_css_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_css_selector("table#test1").thenReturn([])
-        
+
         finder.find_by_content(browser, "css=table#test1", 'hi')
 
-        verify(browser).find_elements_by_css_selector("table#test1")
+        self._verify_searched(browser, finder, 'hi',
+                              ['css', "table#test1"])
 
     def test_find_by_content_with_xpath_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_xpath("//table[@id='test1']//*").thenReturn([])
-        
+
         finder.find_by_content(browser, "xpath=//table[@id='test1']", 'hi')
 
-        verify(browser).find_elements_by_xpath("//table[@id='test1']//*")
+        self._verify_searched(browser, finder, 'hi',
+                              ['xpath', "//table[@id='test1']//*"])
 
     def test_find_by_header_with_css_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_css_selector("table#test1 th").thenReturn([])
-        
+
         finder.find_by_header(browser, "css=table#test1", 'hi')
 
-        verify(browser).find_elements_by_css_selector("table#test1 th")
+        self._verify_searched(browser, finder, 'hi',
+                              ['css', "table#test1 th"])
 
     def test_find_by_header_with_xpath_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_xpath("//table[@id='test1']//th").thenReturn([])
-        
+
         finder.find_by_header(browser, "xpath=//table[@id='test1']", 'hi')
 
-        verify(browser).find_elements_by_xpath("//table[@id='test1']//th")
+        self._verify_searched(browser, finder, 'hi',
+                              ['xpath', "//table[@id='test1']//th"])
 
     def test_find_by_footer_with_css_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_css_selector("table#test1 tfoot td").thenReturn([])
-        
+
         finder.find_by_footer(browser, "css=table#test1", 'hi')
 
-        verify(browser).find_elements_by_css_selector("table#test1 tfoot td")
+        self._verify_searched(browser, finder, 'hi',
+                              ['css', "table#test1 tfoot td"])
 
     def test_find_by_footer_with_xpath_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_xpath("//table[@id='test1']//tfoot//td").thenReturn([])
-        
+
         finder.find_by_footer(browser, "xpath=//table[@id='test1']", 'hi')
 
-        verify(browser).find_elements_by_xpath("//table[@id='test1']//tfoot//td")
+        self._verify_searched(browser, finder, 'hi',
+                              ['xpath', "//table[@id='test1']//tfoot//td"])
 
     def test_find_by_row_with_css_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_css_selector("table#test1 tr:nth-child(2)").thenReturn([])
-        
+
         finder.find_by_row(browser, "css=table#test1", 2, 'hi')
 
-        verify(browser).find_elements_by_css_selector("table#test1 tr:nth-child(2)")
+        self._verify_searched(browser, finder, 'hi',
+                              ['css', "table#test1 tr:nth-child(2)"])
 
     def test_find_by_row_with_xpath_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_xpath("//table[@id='test1']//tr[2]//*").thenReturn([])
-        
+
         finder.find_by_row(browser, "xpath=//table[@id='test1']", 2, 'hi')
 
-        verify(browser).find_elements_by_xpath("//table[@id='test1']//tr[2]//*")
+        self._verify_searched(browser, finder, 'hi',
+                              ['xpath', "//table[@id='test1']//tr[2]//*"])
 
     def test_find_by_col_with_css_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_css_selector("table#test1 tr td:nth-child(2)").thenReturn([])
-        when(browser).find_elements_by_css_selector("table#test1 tr th:nth-child(2)").thenReturn([])
-        
+
         finder.find_by_col(browser, "css=table#test1", 2, 'hi')
 
-        verify(browser).find_elements_by_css_selector("table#test1 tr td:nth-child(2)")
-        verify(browser).find_elements_by_css_selector("table#test1 tr th:nth-child(2)")
+        self._verify_searched(browser, finder, 'hi',
+                              ['css', "table#test1 tr td:nth-child(2)"],
+                              ['css', "table#test1 tr th:nth-child(2)"])
 
     def test_find_by_col_with_xpath_locator(self):
         finder = TableElementFinder()
         browser = mock()
-        when(browser).find_elements_by_xpath("//table[@id='test1']//tr//*[self::td or self::th][2]").thenReturn([])
-        
+
         finder.find_by_col(browser, "xpath=//table[@id='test1']", 2, 'hi')
 
-        verify(browser).find_elements_by_xpath("//table[@id='test1']//tr//*[self::td or self::th][2]")
+        self._verify_searched(browser, finder, 'hi',
+                              ['xpath', "//table[@id='test1']//tr//*[self::td or self::th][2]"])
+
+    def test_get_snapshot(self):
+        finder = TableElementFinder()
+        browser = mock()
+        table = self._make_mock_element('table')
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn([table])
+        when(browser).execute_script(finder._rows_script, table, 0, None).thenReturn(
+            [['thead', ['A', 'B'], ['th', 'th']], ['tbody', ['1', '2'], ['td', 'td']]])
+
+        self.assertEqual(finder.get_snapshot(browser, "test1"),
+                         [{'section': 'thead', 'cells': ['A', 'B'], 'tags': ['th', 'th']},
+                          {'section': 'tbody', 'cells': ['1', '2'], 'tags': ['td', 'td']}])
+
+    def test_get_snapshot_of_missing_table(self):
+        finder = TableElementFinder()
+        browser = mock()
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn([])
+
+        self.assertEqual(finder.get_snapshot(browser, "test1"), None)
+
+    def test_get_cell_reads_only_one_row(self):
+        finder = TableElementFinder()
+        browser = mock()
+        table = self._make_mock_element('table')
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn([table])
+        when(browser).execute_script(finder._rows_script, table, 2, 3).thenReturn(
+            [['tbody', ['1', 'name', '2'], ['td', 'th', 'td']]])
+        when(browser).execute_script(finder._rows_script, table, -1, None).thenReturn([])
+
+        self.assertEqual(finder.get_cell(browser, "test1", 2, 0), 'name')
+        self.assertEqual(finder.get_cell(browser, "test1", 2, 1), '1')
+        self.assertEqual(finder.get_cell(browser, "test1", 2, -1), '2')
+        self.assertEqual(finder.get_cell(browser, "test1", 2, 3), None)
+        self.assertEqual(finder.get_cell(browser, "test1", -1, 0), None)
+
+    def test_iter_rows_reads_table_in_chunks(self):
+        finder = TableElementFinder()
+        browser = mock()
+        table = self._make_mock_element('table')
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn([table])
+        when(browser).execute_script(finder._rows_script, table, 0, 2).thenReturn(
+            [['tbody', ['1'], ['td']], ['tbody', ['2'], ['td']]])
+        when(browser).execute_script(finder._rows_script, table, 2, 4).thenReturn(
+            [['tbody', ['3'], ['td']]])
+
+        rows = finder.iter_rows(browser, "test1", chunk_size=2)
+
+        self.assertEqual([row['cells'] for row in rows], [['1'], ['2'], ['3']])
+        verify(browser, times=2).execute_script(finder._rows_script, table, any(), any())
+
+    def test_iter_rows_with_invalid_chunk_size(self):
+        finder = TableElementFinder()
+        browser = mock()
+        self.assertRaises(ValueError, finder.iter_rows, browser, "test1", 0)
+
+    def test_find_by_col_with_header_name(self):
+        finder = TableElementFinder()
+        browser = self._make_mock_browser()
+        table = self._make_mock_element('table')
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn([table])
+        when(browser).execute_script(finder._header_index_script, table, None).thenReturn(
+            [0, {'Id': 1, 'Status': 2}])
+
+        finder.find_by_col(browser, "test1", 'Status', 'hi')
+
+        self._verify_searched(browser, finder, 'hi',
+                              ['css', "table#test1 tr td:nth-child(2)"],
+                              ['css', "table#test1 tr th:nth-child(2)"])
+
+    def test_find_by_col_with_unknown_header_name(self):
+        finder = TableElementFinder()
+        browser = self._make_mock_browser()
+        table = self._make_mock_element('table')
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn([table])
+        when(browser).execute_script(finder._header_index_script, table, None).thenReturn([0, {}])
+
+        self.assertEqual(finder.find_by_col(browser, "test1", 'Status', 'hi'), None)
+
+    def test_header_index_is_reused_while_table_is_unchanged(self):
+        finder = TableElementFinder()
+        browser = self._make_mock_browser()
+        table = self._make_mock_element('table')
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn([table])
+        when(browser).execute_script(finder._header_index_script, table, None).thenReturn(
+            [0, {'Status': 2}])
+        when(browser).execute_script(finder._header_index_script, table, 0).thenReturn(
+            None).thenReturn([1, {'Status': 3}])
+
+        self.assertEqual(finder.get_column_index(browser, "test1", 'Status'), 2)
+        self.assertEqual(finder.get_column_index(browser, "test1", 'Status'), 2)
+        self.assertEqual(finder.get_column_index(browser, "test1", 'Status'), 3)
+        verify(browser, times=1).find_elements_by_css_selector("table#test1")
+
+    def test_header_index_is_read_again_when_table_is_stale(self):
+        finder = TableElementFinder()
+        browser = self._make_mock_browser()
+        old_table = self._make_mock_element('table')
+        new_table = self._make_mock_element('table')
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn(
+            [old_table]).thenReturn([new_table])
+        when(browser).execute_script(finder._header_index_script, old_table, None).thenReturn(
+            [0, {'Status': 2}])
+        when(browser).execute_script(finder._header_index_script, old_table, 0).thenRaise(
+            StaleElementReferenceException())
+        when(browser).execute_script(finder._header_index_script, new_table, None).thenReturn(
+            [0, {'Status': 4}])
+
+        self.assertEqual(finder.get_column_index(browser, "test1", 'Status'), 2)
+        self.assertEqual(finder.get_column_index(browser, "test1", 'Status'), 4)
+
+    def test_get_cell_by_header(self):
+        finder = TableElementFinder()
+        browser = self._make_mock_browser()
+        table = self._make_mock_element('table')
+        when(browser).find_elements_by_css_selector("table#test1").thenReturn([table])
+        when(browser).execute_script(finder._header_index_script, table, None).thenReturn(
+            [0, {'Id': 1, 'Status': 2}])
+        when(browser).execute_script(finder._rows_script, table, 1, 2).thenReturn(
+            [['tbody', ['1001', 'Shipped'], ['th', 'td']]])
+
+        self.assertEqual(finder.get_cell_by_header(browser, "test1", 1, 'Status'), 'Shipped')
+        self.assertEqual(finder.get_cell_by_header(browser, "test1", 1, 'Missing'), None)
+
+    def _make_mock_browser(self):
+        browser = mock()
+        page_cache = {}
+        when(browser).get_page_cache().thenReturn(page_cache)
+        return browser
+
+    def _verify_searched(self, browser, finder, content, *queries):
+        queries = [{'queries': [query], 'tag': None, 'constraints': {}} for query in queries]
+        verify(browser).execute_script(finder._search_script, queries, content)
 
     def _make_mock_elements(self, *tags):
         elements = []
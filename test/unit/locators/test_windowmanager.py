@@ -273,6 +273,98 @@ class WindowManagerTests(unittest.TestCase):
             manager.get_window_titles(browser),
             [ 'Title 1', 'Title 2', 'Title 3' ])
 
+    def test_selection_reads_only_matching_cached_window(self):
+        manager = WindowManager()
+        browser = self._make_mock_browser(
+            { 'name': 'win1', 'title': "Title 1", 'url': 'http://localhost/page1.html' },
+            { 'name': 'win2', 'title': "Title 2", 'url': 'http://localhost/page2.html' })
+        info_reads = self._count_info_reads(browser)
+
+        manager.get_window_titles(browser)
+        manager.select(browser, "title=Title 2")
+
+        self.assertEqual(browser.current_window.name, 'win2')
+        self.assertEqual(info_reads, [3])
+
+    def test_selection_does_not_match_outdated_cached_window(self):
+        manager = WindowManager()
+        browser = self._make_mock_browser(
+            { 'name': 'win1', 'title': "Main", 'url': 'http://localhost/page1.html' },
+            { 'name': 'win2', 'title': "Old Title", 'url': 'http://localhost/page2.html' })
+        manager.get_window_titles(browser)
+        browser.switch_to_window('win2')
+        browser.current_window.title = "New Title"
+        browser.switch_to_window('win1')
+
+        self.assertRaises(ValueError, manager.select, browser, "title=Old Title")
+        self.assertEqual(browser.current_window.name, 'win1')
+        manager.select(browser, "title=New Title")
+        self.assertEqual(browser.current_window.name, 'win2')
+
+    def test_listing_windows_reads_only_new_windows(self):
+        manager = WindowManager()
+        browser = self._make_mock_browser(
+            { 'name': 'win1', 'title': "Title 1", 'url': 'http://localhost/page1.html' },
+            { 'name': 'win2', 'title': "Title 2", 'url': 'http://localhost/page2.html' })
+        info_reads = self._count_info_reads(browser)
+
+        self.assertEqual(manager.get_window_titles(browser), ['Title 1', 'Title 2'])
+        self.assertEqual(manager.get_window_names(browser), ['win1', 'win2'])
+        self.assertEqual(info_reads, [2])
+
+    def test_selection_reads_windows_again_when_no_cached_window_matches(self):
+        manager = WindowManager()
+        browser = self._make_mock_browser(
+            { 'name': 'win1', 'title': "Title 1", 'url': 'http://localhost/page1.html' },
+            { 'name': 'win2', 'title': "Title 2", 'url': 'http://localhost/page2.html' })
+        manager.get_window_titles(browser)
+        browser.switch_to_window('win2')
+        browser.current_window.title = "Changed"
+        browser.switch_to_window('win1')
+
+        manager.select(browser, "title=Changed")
+        self.assertEqual(browser.current_window.name, 'win2')
+
+    def test_wait_for_new_window(self):
+        manager = WindowManager()
+        browser = mock()
+        when(browser).get_known_window_handles().thenReturn(set(['main', 'old']))
+        when(browser).get_current_window_handle().thenReturn('main')
+        when(browser).get_window_handles().thenReturn(['main', 'old']).thenReturn(
+            ['main', 'old', 'popup'])
+
+        self.assertEqual(manager.wait_for_new_window(browser, 5), 'popup')
+        verify(browser).switch_to_window('popup')
+        verify(browser, times=2).get_window_handles()
+
+    def test_wait_for_new_window_without_known_handles(self):
+        manager = WindowManager()
+        browser = mock()
+        when(browser).get_known_window_handles().thenReturn(set())
+        when(browser).get_current_window_handle().thenReturn('main')
+        when(browser).get_window_handles().thenReturn(['main', 'popup'])
+
+        self.assertEqual(manager.wait_for_new_window(browser, 5), 'popup')
+
+    def test_wait_for_new_window_timeout(self):
+        manager = WindowManager()
+        browser = mock()
+        when(browser).get_known_window_handles().thenReturn(set(['main']))
+        when(browser).get_current_window_handle().thenReturn('main')
+        when(browser).get_window_handles().thenReturn(['main'])
+
+        self.assertEqual(manager.wait_for_new_window(browser, 0), None)
+        verify(browser, times=0).switch_to_window(any())
+
+    def _count_info_reads(self, browser):
+        reads = [0]
+        get_current_window_info = browser.get_current_window_info
+        def counting_get_current_window_info():
+            reads[0] += 1
+            return get_current_window_info()
+        browser.get_current_window_info = counting_get_current_window_info
+        return reads
+
     def _make_mock_browser(self, *window_specs):
         browser = mock()
 
@@ -305,7 +397,9 @@ class WindowManagerTests(unittest.TestCase):
                     return
             raise NoSuchWindowException(u'Unable to locate window "' + handle_or_name + '"')
 
+        window_infos = {}
         browser.current_window = first_window
+        browser.get_window_info_cache = lambda: window_infos
         browser.get_current_window_handle = lambda: browser.current_window.handle
         browser.get_title = lambda: browser.current_window.title
         browser.get_current_url = lambda: browser.current_window.url
@@ -1,5 +1,6 @@
 import unittest
 from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.remote.command import Command
 from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
 from mockito import *
 
@@ -64,3 +65,85 @@ class WebDriverMonkeyPatchesTests(unittest.TestCase):
         self.assertEqual(info[1], [])
         info = driver.get_current_window_info()
         self.assertEqual(info[1], {})
+
+    def test_page_cache_is_cleared_on_navigation(self):
+        driver = MockWebDriver()
+        when(driver)._base_execute(any(), any()).thenReturn({'value': None})
+        for command in (Command.GET, Command.GO_BACK, Command.GO_FORWARD, Command.REFRESH,
+                        Command.CLICK_ELEMENT, Command.SUBMIT_ELEMENT):
+            driver.get_page_cache()['base_url'] = 'http://localhost'
+            driver.execute(command, {})
+            self.assertEqual(driver.get_page_cache(), {})
+
+    def test_implicit_wait_is_tracked(self):
+        driver = MockWebDriver()
+        when(driver)._base_implicitly_wait(any()).thenReturn(None)
+        self.assertEqual(driver.get_implicit_wait(), 0)
+        driver.implicitly_wait(2.5)
+        self.assertEqual(driver.get_implicit_wait(), 2.5)
+        verify(driver)._base_implicitly_wait(2.5)
+
+    def test_script_timeout_is_tracked(self):
+        driver = MockWebDriver()
+        when(driver)._base_set_script_timeout(any()).thenReturn(None)
+        self.assertEqual(driver.get_script_timeout(), None)
+        driver.set_script_timeout(7)
+        self.assertEqual(driver.get_script_timeout(), 7.0)
+        verify(driver)._base_set_script_timeout(7)
+
+    def test_window_info_of_navigated_window_is_invalidated(self):
+        driver = MockWebDriver()
+        when(driver)._base_execute(any(), any()).thenReturn({'value': None})
+        driver.execute(Command.SWITCH_TO_WINDOW, {'name': 'handle1'})
+        driver.get_window_info_cache().update({'handle1': 'info1', 'handle2': 'info2'})
+        driver.execute(Command.GET_TITLE, {})
+        self.assertEqual(sorted(driver.get_window_info_cache()), ['handle1', 'handle2'])
+        driver.execute(Command.CLICK_ELEMENT, {'id': 'x'})
+        self.assertEqual(sorted(driver.get_window_info_cache()), ['handle2'])
+
+    def test_window_info_is_invalidated_when_current_window_is_unknown(self):
+        driver = MockWebDriver()
+        when(driver)._base_execute(any(), any()).thenReturn({'value': None})
+        driver.get_window_info_cache().update({'handle1': 'info1', 'handle2': 'info2'})
+        driver.execute(Command.GET, {'url': 'http://localhost'})
+        self.assertEqual(driver.get_window_info_cache(), {})
+
+    def test_window_handles_are_remembered(self):
+        driver = MockWebDriver()
+        when(driver)._base_execute(Command.GET_WINDOW_HANDLES, any()).thenReturn({'value': ['a', 'b']})
+        when(driver)._base_execute(Command.GET_CURRENT_WINDOW_HANDLE, any()).thenReturn({'value': 'c'})
+        driver.execute(Command.GET_WINDOW_HANDLES, {})
+        driver.execute(Command.GET_CURRENT_WINDOW_HANDLE, {})
+        self.assertEqual(driver.get_known_window_handles(), set(['a', 'b', 'c']))
+
+    def test_executed_commands_are_counted(self):
+        driver = MockWebDriver()
+        when(driver)._base_execute(any(), any()).thenReturn({'value': None})
+        self.assertEqual(driver.get_command_count(), 0)
+        driver.execute(Command.GET_TITLE, {})
+        driver.execute(Command.FIND_ELEMENTS, {'using': 'id', 'value': 'x'})
+        self.assertEqual(driver.get_command_count(), 2)
+
+    def test_page_cache_is_kept_on_other_commands(self):
+        driver = MockWebDriver()
+        when(driver)._base_execute(any(), any()).thenReturn({'value': None})
+        driver.get_page_cache()['base_url'] = 'http://localhost'
+        driver.execute(Command.GET_TITLE, {})
+        driver.execute(Command.FIND_ELEMENTS, {'using': 'id', 'value': 'x'})
+        self.assertEqual(driver.get_page_cache(), {'base_url': 'http://localhost'})
+
+    def test_page_cache_is_kept_per_window_and_frame(self):
+        driver = MockWebDriver()
+        when(driver)._base_execute(any(), any()).thenReturn({'value': None})
+        driver.get_page_cache()['key'] = 'main'
+        driver.execute(Command.SWITCH_TO_FRAME, {'id': 'frame1'})
+        self.assertEqual(driver.get_page_cache(), {})
+        driver.get_page_cache()['key'] = 'frame1'
+        driver.execute(Command.SWITCH_TO_WINDOW, {'name': 'popup'})
+        self.assertEqual(driver.get_page_cache(), {})
+        driver.execute(Command.SWITCH_TO_WINDOW, {'name': None})
+        self.assertEqual(driver.get_page_cache(), {'key': 'main'})
+        driver.execute(Command.SWITCH_TO_FRAME, {'id': 'frame1'})
+        self.assertEqual(driver.get_page_cache(), {'key': 'frame1'})
+        driver.execute(Command.SWITCH_TO_PARENT_FRAME, None)
+        self.assertEqual(driver.get_page_cache(), {'key': 'main'})
@@ -0,0 +1,49 @@
+import unittest
+from Selenium2Library.utils import LRUCache
+
+
+class LRUCacheTests(unittest.TestCase):
+
+    def test_get_and_set(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('b', 'default'), 'default')
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_least_recently_used_item_is_dropped(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue('c' in cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_shrinking_drops_oldest_items(self):
+        cache = LRUCache(3)
+        for key in 'abc':
+            cache.set(key, key)
+        cache.maxsize = 1
+        self.assertEqual(len(cache), 1)
+        self.assertTrue('c' in cache)
+
+    def test_zero_size_disables_caching(self):
+        cache = LRUCache(0)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(len(cache), 0)
+
+    def test_statistics_and_clear(self):
+        cache = LRUCache(5)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('x')
+        self.assertEqual(cache.get_statistics(),
+                         {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 5})
+        cache.clear()
+        self.assertEqual(cache.get_statistics(),
+                         {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 5})
@@ -17,3 +17,9 @@ class UtilsPackageTests(unittest.TestCase):
         self.assertEqual(
             utils.escape_xpath_value("test \"1\" and '2'"),
             "concat('test \"1\" and ', \"'\", '2', \"'\", '')")
+
+    def test_is_truthy(self):
+        for item in (True, 1, 'True', 'yes', 'anything', ['x']):
+            self.assertTrue(utils.is_truthy(item))
+        for item in (False, 0, None, '', 'False', 'no', 'OFF', '0', 'None', []):
+            self.assertFalse(utils.is_truthy(item))
@@ -0,0 +1,28 @@
+import unittest
+from Selenium2Library.utils import PollStrategy
+
+
+class PollStrategyTests(unittest.TestCase):
+
+    def test_fixed(self):
+        strategy = PollStrategy()
+        self.assertEqual([strategy.get_interval(poll) for poll in range(3)], [0.2, 0.2, 0.2])
+        self.assertEqual(PollStrategy('Fixed', 0.5).get_interval(10), 0.5)
+
+    def test_exponential(self):
+        strategy = PollStrategy('exponential', 0.1, 0.5)
+        self.assertEqual([strategy.get_interval(poll) for poll in range(5)],
+                         [0.1, 0.2, 0.4, 0.5, 0.5])
+        self.assertEqual(PollStrategy('exponential', 0.1, 1, factor=3).get_interval(2), 0.9)
+
+    def test_jitter_stays_within_exponential_interval(self):
+        strategy = PollStrategy('jitter', 0.1, 0.5)
+        for poll in range(10):
+            interval = min(0.1 * 2 ** poll, 0.5)
+            self.assertTrue(interval / 2 <= strategy.get_interval(poll) <= interval)
+
+    def test_invalid_values(self):
+        self.assertRaises(ValueError, PollStrategy, 'random')
+        self.assertRaises(ValueError, PollStrategy, 'fixed', 0)
+        self.assertRaises(ValueError, PollStrategy, 'exponential', 1, 0.5)
+        self.assertRaises(ValueError, PollStrategy, 'exponential', 0.1, 1, 0.5)
@@ -0,0 +1,60 @@
+import json
+import unittest
+from Selenium2Library.utils import WaitStatistics
+
+
+class WaitStatisticsTests(unittest.TestCase):
+
+    def test_record_per_keyword_and_target(self):
+        statistics = WaitStatistics()
+        statistics.record('Wait Until Element Is Visible', 'id=grid', 0.3, 2, 'passed', 5.0)
+        statistics.record('Wait Until Element Is Visible', 'id=grid', 5.1, 20, 'timed out', 5.0)
+        statistics.record('Wait Until Page Contains', 'Done', 0.05, 1, 'passed', 10.0)
+        sites = statistics.get_sites()
+        self.assertEqual([(site['keyword'], site['target']) for site in sites],
+                         [('Wait Until Element Is Visible', 'id=grid'), ('Wait Until Page Contains', 'Done')])
+        grid = sites[0]
+        self.assertEqual(grid['calls'], 2)
+        self.assertEqual(grid['outcomes'], {'passed': 1, 'timed out': 1, 'failed': 0})
+        self.assertEqual(grid['polls'], 22)
+        self.assertEqual(grid['max_time'], 5.1)
+        self.assertEqual(grid['max_timeout'], 5.0)
+        self.assertEqual(grid['p99_time'], 0.3)
+        self.assertEqual(grid['histogram'], [0, 1, 0, 0, 0, 1, 0, 0])
+
+    def test_suggested_timeout_is_based_on_p99_of_passed_waits(self):
+        statistics = WaitStatistics()
+        for elapsed in range(1, 101):
+            statistics.record('Wait Until Page Contains', 'Done', elapsed / 10.0, 1, 'passed', 30.0)
+        site = statistics.get_sites()[0]
+        self.assertEqual(site['p50_time'], 5.0)
+        self.assertEqual(site['p99_time'], 9.9)
+        self.assertEqual(site['suggested_timeout'], 14.9)
+
+    def test_samples_of_passed_waits_are_bounded(self):
+        statistics = WaitStatistics(samples=10)
+        for elapsed in range(1, 1001):
+            statistics.record('Wait Until Page Contains', 'Done', elapsed / 100.0, 1, 'passed', 30.0)
+        site = statistics.get_sites()[0]
+        self.assertEqual(len(statistics._sites[('Wait Until Page Contains', 'Done')]['passed_times']), 10)
+        self.assertEqual(site['calls'], 1000)
+        self.assertEqual(site['max_time'], 10.0)
+        self.assertAlmostEqual(site['total_time'], 5005.0)
+        self.assertTrue(0.01 <= site['p50_time'] <= site['p99_time'] <= 10.0)
+
+    def test_suggested_timeout_has_minimum(self):
+        statistics = WaitStatistics()
+        statistics.record('Wait Until Page Contains', 'Done', 0.01, 1, 'passed', 5.0)
+        statistics.record('Wait Until Page Contains', 'Never', 5.0, 25, 'timed out', 5.0)
+        sites = statistics.get_sites()
+        self.assertEqual(sites[0]['suggested_timeout'], 1.0)
+        self.assertEqual(sites[1]['suggested_timeout'], None)
+
+    def test_format_json(self):
+        statistics = WaitStatistics()
+        statistics.record('Wait For Page Idle', 'page', 0.7, 1, 'passed', 5.0)
+        report = json.loads(statistics.format_json())
+        self.assertEqual(report['buckets'], list(WaitStatistics.buckets))
+        self.assertEqual(report['waits'][0]['keyword'], 'Wait For Page Idle')
+        statistics.clear()
+        self.assertEqual(statistics.get_sites(), [])